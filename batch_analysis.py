@@ -0,0 +1,97 @@
+import argparse
+import json
+import multiprocessing as mp
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import replace
+from typing import Dict, List, Optional
+from models.layout_store import LayoutError
+from video.batch import Timeline, analyze_video, load_layout
+from video.cameras import CameraRegistry
+from video.video_processor import VideoProcessor
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Headless occupancy analysis of recorded videos.")
+    parser.add_argument('videos', nargs='*',
+                        help="Video files to analyse (default: the camera's own video)")
+    parser.add_argument('--camera', help="Camera id from cameras.json whose layout and space ids to use "
+                                         "(default: the monitored camera)")
+    parser.add_argument('--layout', help="Layout file to use instead of the camera's")
+    parser.add_argument('--stride', type=int, default=1, help="Analyse every Nth frame")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1,
+                        help="Videos processed in parallel")
+    parser.add_argument('--enter-threshold', type=int, default=VideoProcessor.OCCUPANCY_THRESHOLD)
+    parser.add_argument('--exit-threshold', type=int, default=VideoProcessor.VACANCY_THRESHOLD)
+    parser.add_argument('--debounce', type=int, default=VideoProcessor.DEBOUNCE_FRAMES,
+                        help="Analysed frames a change must hold before a space flips")
+    parser.add_argument('--output', default='timelines', help="Directory for the timeline JSON files")
+    return parser.parse_args(argv)
+
+
+def timeline_paths(output_dir: str, videos: List[str]) -> Dict[str, str]:
+    """Output file for each video, mirroring the videos' directories below their common parent.
+
+    Videos in one directory map to flat ``<name>.timeline.json`` files, and
+    videos with the same name in different directories cannot overwrite each other.
+    """
+    stems = [os.path.splitext(os.path.abspath(video))[0] for video in videos]
+    try:
+        root = os.path.commonpath([os.path.dirname(stem) for stem in stems])
+        relative = [os.path.relpath(stem, root) for stem in stems]
+    except ValueError:
+        # Different drives have no common parent; keep the drive letter as a directory
+        relative = [stem.replace(':', '').lstrip('\\/') for stem in stems]
+    return {video: os.path.join(output_dir, f"{rel}.timeline.json")
+            for video, rel in zip(videos, relative)}
+
+
+def write_timeline(path: str, timeline: Timeline):
+    with open(path, 'w') as f:
+        json.dump(timeline.to_dict(), f, separators=(',', ':'))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    registry = CameraRegistry.load()
+    camera = registry.get(args.camera) if args.camera else registry.primary
+    if args.layout:
+        camera = replace(camera, layout_path=args.layout, legacy_layout_path=None)
+    videos = list(dict.fromkeys(args.videos or [camera.video_path]))
+    try:
+        # Loaded once here: workers loading it themselves would race to import a legacy layout
+        rects = load_layout(camera)
+    except (OSError, LayoutError, ValueError) as e:
+        print(f"Error loading layout for camera {camera.camera_id}: {e}")
+        return 1
+    paths = timeline_paths(args.output, videos)
+
+    failed = 0
+    workers = max(1, min(args.jobs, len(videos)))
+    # Spawned workers, as in the camera backend, so OpenCV is never forked mid-use
+    with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context('spawn')) as pool:
+        futures = {
+            pool.submit(analyze_video, video, camera, rects, args.stride, args.enter_threshold,
+                        args.exit_threshold, args.debounce): video
+            for video in videos
+        }
+        for future in as_completed(futures):
+            video = futures[future]
+            try:
+                timeline = future.result()
+            except (OSError, ValueError) as e:
+                print(f"Error analysing '{video}': {e}")
+                failed += 1
+                continue
+            path = paths[video]
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            write_timeline(path, timeline)
+            rate = timeline.frame_count / timeline.seconds if timeline.seconds > 0 else 0.0
+            print(f"{video}: {timeline.frame_count} frames, {len(timeline.change_frames)} changes "
+                  f"in {timeline.seconds:.1f}s ({rate:.0f} frames/s) -> {path}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
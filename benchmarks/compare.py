@@ -0,0 +1,38 @@
+import argparse
+import json
+import sys
+from typing import List, Optional
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files stage by stage.")
+    parser.add_argument('baseline')
+    parser.add_argument('candidate')
+    parser.add_argument('--metric', default='mean_ms', choices=['mean_ms', 'p50_ms', 'p95_ms', 'max_ms'])
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help="Exit with status 1 if any stage is this many times slower")
+    args = parser.parse_args(argv)
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+    if baseline.get('spec') != candidate.get('spec'):
+        print("Warning: the two runs used different benchmark settings")
+
+    regressed = False
+    print(f"{'stage':28s} {'baseline':>10s} {'candidate':>10s} {'ratio':>7s}")
+    for name, stats in candidate['stages'].items():
+        before = baseline['stages'].get(name)
+        if before is None:
+            print(f"{name:28s} {'-':>10s} {stats[args.metric]:10.3f} {'new':>7s}")
+            continue
+        ratio = stats[args.metric] / before[args.metric] if before[args.metric] > 0 else float('inf')
+        marker = "  slower" if ratio > args.threshold else ""
+        regressed |= ratio > args.threshold
+        print(f"{name:28s} {before[args.metric]:10.3f} {stats[args.metric]:10.3f} {ratio:7.2f}{marker}")
+    return 1 if regressed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,218 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+import cv2
+import numpy as np
+from benchmarks.synthetic import LotSpec, SyntheticLot, generate_lot
+from database.db_manager import DatabaseManager
+from database.occupancy_history import OccupancyHistory
+from models.parking_space import STATUS_NAMES, SpaceTable, status_codes
+from video.video_processor import VideoProcessor
+
+
+class StageTimer:
+    """Collects wall-clock samples per named stage."""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+
+    @contextmanager
+    def time(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.samples.setdefault(name, []).append((time.perf_counter() - start) * 1000.0)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Count, mean, median, 95th percentile and max in milliseconds per stage."""
+        results = {}
+        for name, samples in self.samples.items():
+            values = np.array(samples)
+            results[name] = {
+                'count': len(values),
+                'mean_ms': round(float(values.mean()), 4),
+                'p50_ms': round(float(np.percentile(values, 50)), 4),
+                'p95_ms': round(float(np.percentile(values, 95)), 4),
+                'max_ms': round(float(values.max()), 4),
+            }
+        return results
+
+
+@contextmanager
+def photo_image_root() -> Iterator[bool]:
+    """Keep a hidden Tk root alive so get_display_image can build PhotoImages.
+
+    Yields False when there is no Tk display; the root is destroyed on exit.
+    """
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception:
+        yield False
+        return
+    try:
+        root.withdraw()
+        yield True
+    finally:
+        root.destroy()
+
+
+def bench_video(lot: SyntheticLot, timer: StageTimer, display_width: int) -> Dict[str, float]:
+    """Run every frame through the same stages update_video uses and time each one.
+
+    Returns how often detection agreed with the generator's ground truth.
+    """
+    processor = VideoProcessor(lot.video_path)
+    # Its own overlay cache: drawing at full and display size on one processor would rebuild it every call
+    display = VideoProcessor(lot.video_path)
+    space_ids = [f"P{i + 1:03d}" for i in range(len(lot.rects))]
+    table = SpaceTable(space_ids, lot.rects)
+    booked = np.zeros(len(table), dtype=bool)
+    booked[::7] = True
+    display_size = VideoProcessor.fit_display_size(processor.frame_shape(), display_width)
+    agreement = []
+    try:
+        with photo_image_root() as with_photo:
+            for frame_index in range(lot.spec.frames):
+                with timer.time('read_frame'):
+                    success, frame = processor.read_frame()
+                if not success:
+                    break
+                with timer.time('process_frame'):
+                    processed = processor.process_frame(frame)
+                with timer.time('check_spaces_occupancy'):
+                    processor.check_spaces_occupancy(lot.rects, processed)
+                with timer.time('detect_occupancy'):
+                    occupied = processor.detect_occupancy(frame, lot.rects)
+                agreement.append(float((occupied == lot.occupied[frame_index]).mean()))
+                table.status[:] = status_codes(occupied, booked)
+                with timer.time('draw_spaces'):
+                    drawn = processor.draw_spaces(frame, table)
+                with timer.time('get_display_frame'):
+                    processor.get_display_frame(drawn, display_width)
+                with timer.time('render_display'):
+                    display.render_display(frame, table.ids, table.rects, table.status, display_size)
+                if with_photo:
+                    with timer.time('get_display_image'):
+                        processor.get_display_image(drawn, display_width)
+    finally:
+        processor.release()
+        display.release()
+    return {'detection_agreement': round(float(np.mean(agreement)), 4) if agreement else 0.0}
+
+
+def bench_database(space_ids: List[str], bookings: int, timer: StageTimer, seed: int):
+    """Time booking and history operations against a fresh database of ``bookings`` rows."""
+    rng = np.random.default_rng(seed)
+    now = datetime.now().replace(microsecond=0)
+    with tempfile.TemporaryDirectory() as directory:
+        db = DatabaseManager(os.path.join(directory, 'bench.db'))
+        try:
+            for _ in range(bookings):
+                space_id = space_ids[rng.integers(len(space_ids))]
+                start = now + timedelta(minutes=int(rng.integers(-600, 600)))
+                with timer.time('create_booking'):
+                    db.create_booking(space_id, "Bench", "bench@example.com", "BENCH",
+                                      start, start + timedelta(minutes=int(rng.integers(15, 240))))
+            for space_id in space_ids:
+                with timer.time('is_space_booked'):
+                    db.is_space_booked(space_id, now)
+                with timer.time('query_space_booked'):
+                    db.query_space_booked(space_id, now)
+            for _ in range(20):
+                with timer.time('get_booked_spaces'):
+                    db.get_booked_spaces(now)
+                with timer.time('get_active_bookings'):
+                    db.get_active_bookings()
+                with timer.time('get_booking_counts'):
+                    db.get_booking_counts()
+            with timer.time('expire_bookings'):
+                db.expire_bookings(now)
+
+            history = OccupancyHistory(db.pool)
+            start = now - timedelta(days=7)
+            history.sync(space_ids, ["free"] * len(space_ids), start)
+            # A week of transitions, flushed in ten-minute batches as the UI would
+            for batch in range(7 * 24 * 6):
+                batch_start = start + timedelta(minutes=10 * batch)
+                for space_id in rng.choice(space_ids, size=max(len(space_ids) // 10, 1)):
+                    status = STATUS_NAMES[rng.integers(len(STATUS_NAMES))]
+                    history.record(space_id, status, batch_start + timedelta(seconds=int(rng.integers(600))))
+                with timer.time('history_flush'):
+                    history.flush(batch_start + timedelta(minutes=10))
+            for _ in range(20):
+                with timer.time('history_utilization_week'):
+                    history.utilization(start, now)
+        finally:
+            db.close()
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    defaults = LotSpec()
+    parser = argparse.ArgumentParser(description="Time the detection, display and database stages "
+                                                 "on a synthetic parking lot.")
+    parser.add_argument('--width', type=int, default=defaults.width)
+    parser.add_argument('--height', type=int, default=defaults.height)
+    parser.add_argument('--spaces', type=int, default=defaults.spaces)
+    parser.add_argument('--frames', type=int, default=defaults.frames)
+    parser.add_argument('--fps', type=float, default=defaults.fps)
+    parser.add_argument('--churn', type=float, default=defaults.churn,
+                        help="Chance per space per second that a car arrives or leaves")
+    parser.add_argument('--seed', type=int, default=defaults.seed)
+    parser.add_argument('--bookings', type=int, default=500, help="Bookings created for the database stages")
+    parser.add_argument('--display-width', type=int, default=1000)
+    parser.add_argument('--data-dir', default='benchmark_data', help="Where generated videos are cached")
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--skip-database', action='store_true')
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    spec = LotSpec(args.width, args.height, args.spaces, args.frames, args.fps, args.churn, args.seed)
+    lot = generate_lot(spec, args.data_dir)
+
+    timer = StageTimer()
+    quality = bench_video(lot, timer, args.display_width)
+    if not args.skip_database:
+        bench_database([f"P{i + 1:03d}" for i in range(spec.spaces)], args.bookings, timer, spec.seed)
+
+    results = {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'environment': {
+            'python': platform.python_version(),
+            'opencv': cv2.__version__,
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'cpus': os.cpu_count(),
+        },
+        'spec': {**vars(spec), 'bookings': args.bookings, 'display_width': args.display_width},
+        'quality': quality,
+        'stages': timer.summary(),
+    }
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    for name, stats in results['stages'].items():
+        print(f"{name:28s} {stats['mean_ms']:9.3f} ms mean {stats['p95_ms']:9.3f} ms p95")
+    print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+import bisect
+import threading
+from datetime import datetime
+from typing import Dict, List, Set, Tuple
+
+Interval = Tuple[float, float, int]  # (start, end, booking_id) as epoch seconds
+
+
+class BookingIndex:
+    """In-memory index of active bookings, kept as sorted intervals per space."""
+
+    def __init__(self):
+        self._intervals: Dict[str, List[Interval]] = {}
+        self._space_by_booking: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def load(self, bookings: List[Tuple[int, str, datetime, datetime]]):
+        """Replace the index contents with (booking_id, space_id, start, end) rows."""
+        with self._lock:
+            self._intervals.clear()
+            self._space_by_booking.clear()
+            for booking_id, space_id, start_time, end_time in bookings:
+                self._add(booking_id, space_id, start_time, end_time)
+
+    def add(self, booking_id: int, space_id: str, start_time: datetime, end_time: datetime):
+        """Add a booking to the index."""
+        with self._lock:
+            self._add(booking_id, space_id, start_time, end_time)
+
+    def _add(self, booking_id: int, space_id: str, start_time: datetime, end_time: datetime):
+        interval = (start_time.timestamp(), end_time.timestamp(), booking_id)
+        bisect.insort(self._intervals.setdefault(space_id, []), interval)
+        self._space_by_booking[booking_id] = space_id
+
+    def remove(self, booking_id: int):
+        """Remove a booking from the index if present."""
+        with self._lock:
+            self._remove(booking_id)
+
+    def _remove(self, booking_id: int):
+        space_id = self._space_by_booking.pop(booking_id, None)
+        if space_id is None:
+            return
+        intervals = self._intervals[space_id]
+        intervals[:] = [iv for iv in intervals if iv[2] != booking_id]
+        if not intervals:
+            del self._intervals[space_id]
+
+    def is_booked(self, space_id: str, current_time: datetime) -> bool:
+        """Check whether a space has a booking covering ``current_time``."""
+        now = current_time.timestamp()
+        with self._lock:
+            return self._covers(self._intervals.get(space_id, ()), now)
+
+    def booked_spaces(self, current_time: datetime) -> Set[str]:
+        """Return the ids of every space booked at ``current_time``."""
+        now = current_time.timestamp()
+        with self._lock:
+            return {space_id for space_id, intervals in self._intervals.items()
+                    if self._covers(intervals, now)}
+
+    @staticmethod
+    def _covers(intervals: List[Interval], now: float) -> bool:
+        # Intervals are sorted by start, so only those starting at or before now can match
+        stop = bisect.bisect_right(intervals, (now, float('inf'), 0))
+        return any(end >= now for _, end, _ in intervals[:stop])
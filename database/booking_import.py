@@ -0,0 +1,35 @@
+import csv
+from datetime import datetime
+from typing import List, Tuple
+from database.db_manager import BookingRequest
+
+# Header of a bulk booking file; times are ISO 8601, e.g. 2025-06-01 08:00
+CSV_COLUMNS = ('space_id', 'user_name', 'user_email', 'license_plate', 'start_time', 'end_time')
+
+
+def read_booking_csv(path: str) -> Tuple[List[BookingRequest], List[str]]:
+    """Read reservations from a CSV file with a CSV_COLUMNS header.
+
+    Returns the valid requests and a message for every row that could not be read.
+    """
+    requests: List[BookingRequest] = []
+    errors: List[str] = []
+    with open(path, newline='') as f:
+        reader = csv.DictReader(f)
+        missing = [column for column in CSV_COLUMNS if column not in (reader.fieldnames or ())]
+        if missing:
+            return [], [f"Missing column(s): {', '.join(missing)}"]
+        for line, row in enumerate(reader, start=2):
+            values = {column: (row[column] or '').strip() for column in CSV_COLUMNS}
+            if not all(values.values()):
+                errors.append(f"Line {line}: all fields are required")
+                continue
+            try:
+                start_time = datetime.fromisoformat(values['start_time'])
+                end_time = datetime.fromisoformat(values['end_time'])
+            except ValueError as e:
+                errors.append(f"Line {line}: {e}")
+                continue
+            requests.append(BookingRequest(values['space_id'], values['user_name'], values['user_email'],
+                                           values['license_plate'], start_time, end_time))
+    return requests, errors
@@ -0,0 +1,130 @@
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence
+from metrics.registry import MetricsRegistry
+
+# Applied to every connection; WAL lets readers proceed while the writer commits
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -8000",
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA foreign_keys = OFF",
+)
+
+
+@dataclass
+class QueryStats:
+    """Running latency totals for one named query."""
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.count if self.count else 0.0
+
+    def record(self, elapsed_ms: float):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+
+
+class ConnectionPool:
+    """Long-lived SQLite connections: one shared writer plus one reader per thread.
+
+    Statements are reused from each connection's statement cache, and every
+    query is timed under a caller-supplied name. With ``metrics`` set, each
+    timing also goes into its ``db.<name>`` histogram.
+    """
+
+    def __init__(self, db_path: str, cached_statements: int = 128,
+                 metrics: Optional[MetricsRegistry] = None):
+        self.db_path = db_path
+        self.cached_statements = cached_statements
+        self.metrics = metrics
+        self._write_lock = threading.RLock()
+        self._writer = self._connect()
+        self._local = threading.local()
+        self._readers: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+        self._stats: Dict[str, QueryStats] = {}
+        self._stats_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=5.0, check_same_thread=False,
+                               cached_statements=self.cached_statements)
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def reader(self) -> sqlite3.Connection:
+        """Return the calling thread's read connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            with self._readers_lock:
+                self._readers.append(conn)
+        return conn
+
+    def query(self, name: str, sql: str, params: Sequence = ()) -> List[tuple]:
+        """Run a read-only query on this thread's reader and return all rows."""
+        start = time.perf_counter()
+        try:
+            return self.reader().execute(sql, params).fetchall()
+        finally:
+            self.record(name, start)
+
+    @contextmanager
+    def transaction(self, name: str, immediate: bool = False) -> Iterator[sqlite3.Connection]:
+        """Hold the writer for one transaction; commits on success, rolls back on error.
+
+        ``immediate`` takes SQLite's write lock before the first statement, so
+        a read-then-write check cannot race writers in other processes.
+        """
+        with self._write_lock:
+            start = time.perf_counter()
+            try:
+                if immediate:
+                    self._writer.execute("BEGIN IMMEDIATE")
+                yield self._writer
+                self._writer.commit()
+            except BaseException:
+                self._writer.rollback()
+                raise
+            finally:
+                self.record(name, start)
+
+    def record(self, name: str, start: float):
+        """Record the latency of a query that began at ``start`` (perf_counter seconds)."""
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        with self._stats_lock:
+            self._stats.setdefault(name, QueryStats()).record(elapsed_ms)
+        if self.metrics is not None:
+            self.metrics.observe(f"db.{name}", elapsed_ms)
+
+    def get_stats(self) -> Dict[str, QueryStats]:
+        """Return a snapshot of per-query latency statistics."""
+        with self._stats_lock:
+            return {name: QueryStats(s.count, s.total_ms, s.max_ms)
+                    for name, s in self._stats.items()}
+
+    def reset_stats(self):
+        """Clear all recorded latency statistics."""
+        with self._stats_lock:
+            self._stats.clear()
+
+    def close(self):
+        """Close the writer and every reader connection."""
+        with self._readers_lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers.clear()
+        with self._write_lock:
+            self._writer.close()
+        self._local = threading.local()
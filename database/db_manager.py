@@ -1,15 +1,160 @@
 import sqlite3
+from dataclasses import dataclass, replace
 from datetime import datetime
-from typing import List, Dict, Optional, Tuple
+from typing import Callable, List, Dict, Optional, Set, Tuple
+from database.booking_cache import BookingIndex
+from database.connection_pool import ConnectionPool, QueryStats
+from database.expiry_scheduler import ExpiryScheduler
+from metrics.registry import MetricsRegistry
+
+def to_epoch(value: datetime) -> int:
+    """Convert a naive local datetime to integer epoch seconds."""
+    return int(value.timestamp())
+
+def from_epoch(value: int) -> datetime:
+    """Convert integer epoch seconds to a naive local datetime."""
+    return datetime.fromtimestamp(value)
+
+def migrate_to_epoch_bookings(conn: sqlite3.Connection):
+    """Version 1: TEXT space ids, epoch-integer times and covering indexes on bookings.
+
+    A booking whose times cannot be parsed aborts the migration, so the old
+    table is left untouched rather than losing the row.
+    """
+    conn.execute('''CREATE TABLE bookings_v1
+                    (id INTEGER PRIMARY KEY,
+                     space_id TEXT NOT NULL,
+                     user_name TEXT,
+                     user_email TEXT,
+                     license_plate TEXT,
+                     start_time INTEGER NOT NULL,
+                     end_time INTEGER NOT NULL,
+                     is_active INTEGER NOT NULL DEFAULT 1)''')
+    
+    rows = []
+    for row in conn.execute("""
+        SELECT id, space_id, user_name, user_email, license_plate, start_time, end_time, is_active
+        FROM bookings
+    """):
+        booking_id, start_time, end_time = row[0], row[5], row[6]
+        try:
+            start_ts = to_epoch(datetime.fromisoformat(str(start_time)))
+            end_ts = to_epoch(datetime.fromisoformat(str(end_time)))
+        except ValueError as e:
+            raise ValueError(f"Cannot migrate booking {booking_id}: {e}") from e
+        rows.append((booking_id, str(row[1]), row[2], row[3], row[4],
+                     start_ts, end_ts, 1 if row[7] else 0))
+    conn.executemany("INSERT INTO bookings_v1 VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    
+    conn.execute("DROP TABLE bookings")
+    conn.execute("ALTER TABLE bookings_v1 RENAME TO bookings")
+    conn.execute("""CREATE INDEX idx_bookings_space_active_time
+                    ON bookings (space_id, is_active, start_time, end_time)""")
+    conn.execute("""CREATE INDEX idx_bookings_active_end
+                    ON bookings (is_active, end_time)""")
+
+def migrate_booking_counts(conn: sqlite3.Connection):
+    """Version 2: per-space booking totals kept current by triggers on bookings."""
+    conn.execute('''CREATE TABLE booking_counts
+                    (space_id TEXT PRIMARY KEY,
+                     total INTEGER NOT NULL)''')
+    conn.execute("""INSERT INTO booking_counts (space_id, total)
+                    SELECT space_id, COUNT(*) FROM bookings GROUP BY space_id""")
+    conn.execute("""CREATE TRIGGER trg_booking_counts_insert AFTER INSERT ON bookings
+                    BEGIN
+                        INSERT INTO booking_counts (space_id, total) VALUES (NEW.space_id, 1)
+                        ON CONFLICT (space_id) DO UPDATE SET total = total + 1;
+                    END""")
+    conn.execute("""CREATE TRIGGER trg_booking_counts_delete AFTER DELETE ON bookings
+                    BEGIN
+                        UPDATE booking_counts SET total = total - 1 WHERE space_id = OLD.space_id;
+                    END""")
+
+def migrate_occupancy_history(conn: sqlite3.Connection):
+    """Version 3: run-length occupancy segments with per-minute and per-hour rollups."""
+    conn.execute('''CREATE TABLE occupancy_segments
+                    (space_id TEXT NOT NULL,
+                     status INTEGER NOT NULL,
+                     start_time INTEGER NOT NULL,
+                     end_time INTEGER NOT NULL)''')
+    conn.execute("""CREATE INDEX idx_occupancy_segments_space_time
+                    ON occupancy_segments (space_id, start_time)""")
+    conn.execute('''CREATE TABLE occupancy_open
+                    (space_id TEXT PRIMARY KEY,
+                     status INTEGER NOT NULL,
+                     start_time INTEGER NOT NULL)''')
+    for table, bucket in (('occupancy_minutes', 'minute'), ('occupancy_hours', 'hour')):
+        conn.execute(f'''CREATE TABLE {table}
+                         ({bucket} INTEGER NOT NULL,
+                          space_id TEXT NOT NULL,
+                          occupied_seconds INTEGER NOT NULL,
+                          booked_seconds INTEGER NOT NULL,
+                          PRIMARY KEY ({bucket}, space_id)) WITHOUT ROWID''')
+    conn.execute('''CREATE TABLE occupancy_heartbeat
+                    (id INTEGER PRIMARY KEY CHECK (id = 0),
+                     last_seen INTEGER NOT NULL)''')
+
+# Ordered (version, migration) pairs; each runs once inside the init transaction,
+# which starts with an explicit BEGIN so the DDL rolls back with everything else
+MIGRATIONS = [
+    (1, migrate_to_epoch_bookings),
+    (2, migrate_booking_counts),
+    (3, migrate_occupancy_history),
+]
+
+BOOKING_COLUMNS = ['id', 'space_id', 'user_name', 'user_email', 'license_plate',
+                   'start_time', 'end_time', 'is_active']
+
+# First active booking of a space overlapping [start, end); answered from idx_bookings_space_active_time
+OVERLAP_QUERY = """
+    SELECT id FROM bookings
+    WHERE space_id = ? AND is_active = 1 AND start_time < ? AND end_time > ?
+    ORDER BY start_time
+    LIMIT 1
+"""
+
+@dataclass
+class BookingRequest:
+    """One reservation to be made."""
+    space_id: str
+    user_name: str
+    user_email: str
+    license_plate: str
+    start_time: datetime
+    end_time: datetime
+
+@dataclass
+class BookingResult:
+    """Outcome of one BookingRequest: its new id, or why it was not booked."""
+    request: BookingRequest
+    booking_id: Optional[int] = None
+    conflict_id: Optional[int] = None  # Active booking it overlaps, possibly from the same batch
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.booking_id is not None
+
+def booking_from_row(row: tuple) -> Dict:
+    """Build a booking dict from a bookings row, with times as datetimes."""
+    booking = dict(zip(BOOKING_COLUMNS, row))
+    booking['start_time'] = from_epoch(booking['start_time'])
+    booking['end_time'] = from_epoch(booking['end_time'])
+    booking['is_active'] = bool(booking['is_active'])
+    return booking
 
 class DatabaseManager:
-    def __init__(self, db_path: str = 'parking.db'):
+    def __init__(self, db_path: str = 'parking.db', metrics: Optional[MetricsRegistry] = None):
         self.db_path = db_path
+        self.pool = ConnectionPool(db_path, metrics=metrics)
+        self.booking_index = BookingIndex()
+        self.expiry_scheduler = ExpiryScheduler(self.expire_bookings)
         self.init_database()
+        self.load_booking_index()
 
     def init_database(self):
-        """Initialize the database and create necessary tables."""
-        with sqlite3.connect(self.db_path) as conn:
+        """Initialize the database, create necessary tables and apply pending migrations."""
+        with self.pool.transaction('init_database', immediate=True) as conn:
             c = conn.cursor()
             
             # Create tables if they don't exist
@@ -27,79 +172,191 @@ class DatabaseManager:
                          is_active BOOLEAN,
                          FOREIGN KEY (space_id) REFERENCES parking_spaces (id))''')
             
-            conn.commit()
+            version = c.execute("PRAGMA user_version").fetchone()[0]
+            for target, migrate in MIGRATIONS:
+                if version < target:
+                    migrate(conn)
+                    c.execute(f"PRAGMA user_version = {target}")
+                    version = target
 
     def create_booking(self, space_id: str, user_name: str, user_email: str, 
-                      license_plate: str, start_time: datetime, end_time: datetime) -> bool:
-        """Create a new booking in the database."""
-        with sqlite3.connect(self.db_path) as conn:
-            c = conn.cursor()
-            try:
-                c.execute("""
-                    INSERT INTO bookings 
-                    (space_id, user_name, user_email, license_plate, start_time, end_time, is_active)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                """, (space_id, user_name, user_email, license_plate, start_time, end_time, True))
-                conn.commit()
-                return True
-            except sqlite3.Error:
-                return False
+                      license_plate: str, start_time: datetime, end_time: datetime) -> Optional[int]:
+        """Create a new booking in the database; returns its id, or None if it failed or overlaps another."""
+        request = BookingRequest(space_id, user_name, user_email, license_plate, start_time, end_time)
+        return self.create_bookings([request])[0].booking_id
+
+    def create_bookings(self, requests: List[BookingRequest]) -> List[BookingResult]:
+        """Book many reservations in one transaction, skipping any that overlap an active booking.
+
+        The write lock is taken before the first overlap check, so concurrent
+        writers, in this process or another, cannot book the same time twice.
+        Requests are checked in order, so a later request that overlaps an
+        earlier one in the batch is reported as a conflict with it.
+        """
+        results = []
+        for request in requests:
+            # Stored times have one-second resolution; keep the index in step with them
+            request = replace(request, start_time=request.start_time.replace(microsecond=0),
+                              end_time=request.end_time.replace(microsecond=0))
+            error = "End time must be after start time" if request.end_time <= request.start_time else None
+            results.append(BookingResult(request, error=error))
+        pending = [result for result in results if result.error is None]
+        if not pending:
+            return results
+
+        try:
+            with self.pool.transaction('create_bookings', immediate=True) as conn:
+                for result in pending:
+                    request = result.request
+                    start_ts, end_ts = to_epoch(request.start_time), to_epoch(request.end_time)
+                    conflict = conn.execute(OVERLAP_QUERY, (request.space_id, end_ts, start_ts)).fetchone()
+                    if conflict is not None:
+                        result.conflict_id = conflict[0]
+                        result.error = f"Overlaps booking {conflict[0]} for space {request.space_id}"
+                        continue
+                    c = conn.execute("""
+                        INSERT INTO bookings 
+                        (space_id, user_name, user_email, license_plate, start_time, end_time, is_active)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
+                    """, (request.space_id, request.user_name, request.user_email,
+                          request.license_plate, start_ts, end_ts, 1))
+                    result.booking_id = c.lastrowid
+        except sqlite3.Error as e:
+            print(f"Error creating bookings: {e}")
+            for result in pending:
+                result.booking_id = None
+                result.error = result.error or f"Database error: {e}"
+            return results
+
+        for result in pending:
+            if result.ok:
+                request = result.request
+                self.booking_index.add(result.booking_id, request.space_id, request.start_time, request.end_time)
+                self.expiry_scheduler.schedule(result.booking_id, request.end_time)
+        return results
 
     def get_active_bookings(self) -> List[Dict]:
         """Get all active bookings."""
-        with sqlite3.connect(self.db_path) as conn:
-            c = conn.cursor()
-            c.execute("""
-                SELECT id, space_id, user_name, user_email, license_plate, 
-                       start_time, end_time, is_active
-                FROM bookings
-                WHERE is_active = 1
-                ORDER BY start_time DESC
-            """)
-            columns = ['id', 'space_id', 'user_name', 'user_email', 'license_plate', 
-                      'start_time', 'end_time', 'is_active']
-            return [dict(zip(columns, row)) for row in c.fetchall()]
-
-    def get_expired_bookings(self) -> List[Dict]:
-        """Get all expired bookings."""
-        with sqlite3.connect(self.db_path) as conn:
-            c = conn.cursor()
-            c.execute("""
-                SELECT id, space_id, user_name, user_email, license_plate, 
-                       start_time, end_time, is_active
-                FROM bookings
-                WHERE is_active = 0
-                ORDER BY end_time DESC
-            """)
-            columns = ['id', 'space_id', 'user_name', 'user_email', 'license_plate', 
-                      'start_time', 'end_time', 'is_active']
-            return [dict(zip(columns, row)) for row in c.fetchall()]
+        rows = self.pool.query('get_active_bookings', """
+            SELECT id, space_id, user_name, user_email, license_plate, 
+                   start_time, end_time, is_active
+            FROM bookings
+            WHERE is_active = 1
+            ORDER BY start_time DESC
+        """)
+        return [booking_from_row(row) for row in rows]
+
+    def get_expired_bookings(self, limit: Optional[int] = None,
+                             before: Optional[Tuple[datetime, int]] = None) -> List[Dict]:
+        """Get expired bookings, newest first.
+
+        ``limit`` caps the page size and ``before`` is the (end_time, id) of the
+        last booking on the previous page, so pages are read straight off the
+        (is_active, end_time) index without an OFFSET scan.
+        """
+        sql = """
+            SELECT id, space_id, user_name, user_email, license_plate, 
+                   start_time, end_time, is_active
+            FROM bookings
+            WHERE is_active = 0
+        """
+        params: List = []
+        if before is not None:
+            # A row value comparison, so SQLite bounds the index scan at the cursor
+            sql += " AND (end_time, id) < (?, ?)"
+            params += [to_epoch(before[0]), before[1]]
+        sql += " ORDER BY end_time DESC, id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        rows = self.pool.query('get_expired_bookings', sql, params)
+        return [booking_from_row(row) for row in rows]
 
     def cancel_booking(self, booking_id: int) -> bool:
         """Cancel a booking by setting is_active to False."""
-        with sqlite3.connect(self.db_path) as conn:
-            c = conn.cursor()
-            try:
-                c.execute("UPDATE bookings SET is_active = 0 WHERE id = ?", (booking_id,))
-                conn.commit()
-                return True
-            except sqlite3.Error:
-                return False
+        try:
+            with self.pool.transaction('cancel_booking') as conn:
+                conn.execute("UPDATE bookings SET is_active = 0 WHERE id = ?", (booking_id,))
+        except sqlite3.Error:
+            return False
+        self.booking_index.remove(booking_id)
+        return True
+
+    def expire_bookings(self, current_time: datetime) -> List[int]:
+        """Deactivate every active booking that has ended, in one batched update."""
+        now = to_epoch(current_time)
+        with self.pool.transaction('expire_bookings') as conn:
+            expired = [row[0] for row in conn.execute(
+                "SELECT id FROM bookings WHERE is_active = 1 AND end_time <= ?", (now,))]
+            if expired:
+                conn.execute("UPDATE bookings SET is_active = 0 WHERE is_active = 1 AND end_time <= ?",
+                             (now,))
+        for booking_id in expired:
+            self.booking_index.remove(booking_id)
+        return expired
+
+    def get_booking_spaces(self, booking_ids: List[int]) -> Dict[int, str]:
+        """Map booking ids to their space ids."""
+        if not booking_ids:
+            return {}
+        placeholders = ", ".join("?" * len(booking_ids))
+        rows = self.pool.query('get_booking_spaces',
+                               f"SELECT id, space_id FROM bookings WHERE id IN ({placeholders})",
+                               tuple(booking_ids))
+        return dict(rows)
+
+    def start_expiry_scheduler(self, on_expired: Optional[Callable[[List[int]], None]] = None):
+        """Start expiring bookings at their end time; ``on_expired`` runs on the scheduler thread."""
+        self.expiry_scheduler.on_expired = on_expired
+        self.expiry_scheduler.start()
+
+    def load_booking_index(self):
+        """Load all active bookings into the in-memory booking index."""
+        rows = self.pool.query('load_booking_index', """
+            SELECT id, space_id, start_time, end_time
+            FROM bookings
+            WHERE is_active = 1
+        """)
+        bookings = [(booking_id, space_id, from_epoch(start_ts), from_epoch(end_ts))
+                    for booking_id, space_id, start_ts, end_ts in rows]
+        self.booking_index.load(bookings)
+        self.expiry_scheduler.schedule_many([(booking[0], booking[3]) for booking in bookings])
 
     def is_space_booked(self, space_id: str, current_time: datetime) -> bool:
-        """Check if a space is currently booked."""
-        with sqlite3.connect(self.db_path) as conn:
-            c = conn.cursor()
-            c.execute("""
-                SELECT 1 FROM bookings 
-                WHERE space_id = ? AND is_active = 1 
-                AND ? BETWEEN datetime(start_time) AND datetime(end_time)
-            """, (space_id, current_time.strftime('%Y-%m-%d %H:%M:%S')))
-            return c.fetchone() is not None
+        """Check if a space is currently booked, using the in-memory booking index."""
+        return self.booking_index.is_booked(space_id, current_time)
+
+    def get_booked_spaces(self, current_time: datetime) -> Set[str]:
+        """Get the ids of all spaces booked at the given time, without touching disk."""
+        return self.booking_index.booked_spaces(current_time)
+
+    def query_space_booked(self, space_id: str, current_time: datetime) -> bool:
+        """Check if a space is currently booked by querying the database directly."""
+        now = to_epoch(current_time)
+        rows = self.pool.query('query_space_booked', """
+            SELECT 1 FROM bookings 
+            WHERE space_id = ? AND is_active = 1 
+            AND start_time <= ? AND end_time >= ?
+            LIMIT 1
+        """, (space_id, now, now))
+        return bool(rows)
 
     def get_booking_count(self, space_id: str) -> int:
         """Get the total number of bookings for a space."""
-        with sqlite3.connect(self.db_path) as conn:
-            c = conn.cursor()
-            c.execute("SELECT COUNT(*) FROM bookings WHERE space_id = ?", (space_id,))
-            return c.fetchone()[0] 
\ No newline at end of file
+        rows = self.pool.query('get_booking_count',
+                               "SELECT total FROM booking_counts WHERE space_id = ?", (space_id,))
+        return rows[0][0] if rows else 0
+
+    def get_booking_counts(self) -> Dict[str, int]:
+        """Get the total number of bookings for every space in one query."""
+        rows = self.pool.query('get_booking_counts', "SELECT space_id, total FROM booking_counts")
+        return dict(rows)
+
+    def get_query_stats(self) -> Dict[str, QueryStats]:
+        """Get per-query latency statistics collected since startup."""
+        return self.pool.get_stats()
+
+    def close(self):
+        """Stop the expiry scheduler and close all pooled database connections."""
+        self.expiry_scheduler.stop()
+        self.pool.close() 
\ No newline at end of file
@@ -0,0 +1,92 @@
+import heapq
+import threading
+import time
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+
+
+class ExpiryScheduler:
+    """Expires bookings at their end time from a min-heap of pending end times.
+
+    The worker thread sleeps until the earliest end time, then expires every
+    due booking with one batched call. Entries for bookings that were cancelled
+    early are harmless: the batched expiry only touches still-active rows.
+    If the expiry fails, for example because the database is locked, the due
+    entries are re-queued and retried after RETRY_DELAY seconds.
+    """
+    RETRY_DELAY = 1.0  # Seconds before retrying a failed expiry
+
+    def __init__(self, expire_due: Callable[[datetime], List[int]],
+                 on_expired: Optional[Callable[[List[int]], None]] = None):
+        self.expire_due = expire_due
+        self.on_expired = on_expired
+        self._heap: List[Tuple[float, int]] = []
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+
+    def schedule(self, booking_id: int, end_time: datetime):
+        """Register a booking's end time, waking the worker if it is now the earliest."""
+        with self._cond:
+            heapq.heappush(self._heap, (end_time.timestamp(), booking_id))
+            if self._heap[0][1] == booking_id:
+                self._cond.notify()
+
+    def schedule_many(self, bookings: List[Tuple[int, datetime]]):
+        """Register several (booking_id, end_time) pairs at once."""
+        with self._cond:
+            for booking_id, end_time in bookings:
+                self._heap.append((end_time.timestamp(), booking_id))
+            heapq.heapify(self._heap)
+            self._cond.notify()
+
+    def start(self):
+        """Start the expiry thread."""
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="booking-expiry", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        """Stop the expiry thread."""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def next_expiry(self) -> Optional[datetime]:
+        """Return the earliest pending end time, if any."""
+        with self._cond:
+            return datetime.fromtimestamp(self._heap[0][0]) if self._heap else None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    delay = self._heap[0][0] - time.time()
+                    if delay <= 0:
+                        break
+                    self._cond.wait(delay)
+                if self._stopped:
+                    return
+                now = time.time()
+                due = []
+                while self._heap and self._heap[0][0] <= now:
+                    due.append(heapq.heappop(self._heap))
+            try:
+                expired = self.expire_due(datetime.fromtimestamp(now))
+            except Exception as e:
+                print(f"Error expiring bookings, retrying in {self.RETRY_DELAY}s: {e}")
+                with self._cond:
+                    for _, booking_id in due:
+                        heapq.heappush(self._heap, (now + self.RETRY_DELAY, booking_id))
+                continue
+            if expired and self.on_expired is not None:
+                try:
+                    self.on_expired(expired)
+                except Exception as e:
+                    print(f"Error handling expired bookings {expired}: {e}")
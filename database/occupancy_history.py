@@ -0,0 +1,195 @@
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+from database.connection_pool import ConnectionPool
+from database.db_manager import from_epoch, to_epoch
+from models.parking_space import FREE, OCCUPIED, STATUS_CODES, STATUS_NAMES
+
+Segment = Tuple[str, int, int, int]  # (space_id, status code, start, end) in epoch seconds
+
+# Rollup tables, their bucket column and bucket length in seconds
+ROLLUPS = (('occupancy_minutes', 'minute', 60), ('occupancy_hours', 'hour', 3600))
+
+
+def rollup_rows(segments: Sequence[Segment], bucket_seconds: int) -> List[Tuple[int, str, int, int]]:
+    """Split closed segments into (bucket, space_id, occupied_seconds, booked_seconds) rows."""
+    totals: Dict[Tuple[int, str], List[int]] = {}
+    for space_id, status, start, end in segments:
+        if status == FREE:
+            continue
+        column = 0 if status == OCCUPIED else 1
+        for bucket in range(start // bucket_seconds, (end - 1) // bucket_seconds + 1):
+            bucket_start = bucket * bucket_seconds
+            seconds = min(end, bucket_start + bucket_seconds) - max(start, bucket_start)
+            totals.setdefault((bucket, space_id), [0, 0])[column] += seconds
+    return [(bucket, space_id, occupied, booked)
+            for (bucket, space_id), (occupied, booked) in totals.items()]
+
+
+class OccupancyHistory:
+    """Records every space's status over time as run-length segments.
+
+    Only transitions are kept: each space has one open segment (its current
+    status and since when), and a change closes it into
+    ``occupancy_segments``. Closed segments are added to per-minute and
+    per-hour rollups as they are written, so utilization over long ranges
+    sums a few hundred rollup rows instead of scanning segments. Transitions
+    are buffered and written together by ``flush``.
+    """
+
+    def __init__(self, pool: ConnectionPool):
+        self.pool = pool
+        self._lock = threading.Lock()
+        self._closed: List[Segment] = []
+        self._dirty: Dict[str, Optional[Tuple[int, int]]] = {}  # Open segments to write; None deletes
+        self.open: Dict[str, Tuple[int, int]] = {
+            space_id: (status, start) for space_id, status, start in
+            pool.query('load_open_segments', "SELECT space_id, status, start_time FROM occupancy_open")
+        }
+
+    def recover(self):
+        """Close segments a previous run left open, at the last time that run flushed.
+
+        Without this, the time the system was down would count as the status
+        the spaces had when it stopped.
+        """
+        rows = self.pool.query('occupancy_heartbeat', "SELECT last_seen FROM occupancy_heartbeat")
+        last_seen = rows[0][0] if rows else None
+        with self._lock:
+            for space_id, (status, start) in self.open.items():
+                if last_seen is not None and last_seen > start:
+                    self._closed.append((space_id, status, start, last_seen))
+                self._dirty[space_id] = None
+            self.open = {}
+        self.flush()
+
+    def record(self, space_id: str, status: str, timestamp: datetime):
+        """Note that ``space_id`` has ``status`` from ``timestamp`` on; repeats are ignored."""
+        code = STATUS_CODES[status]
+        now = to_epoch(timestamp)
+        with self._lock:
+            current = self.open.get(space_id)
+            if current is not None:
+                if current[0] == code:
+                    return
+                if now > current[1]:
+                    self._closed.append((space_id, current[0], current[1], now))
+            self.open[space_id] = self._dirty[space_id] = (code, now)
+
+    def sync(self, space_ids: Sequence[str], statuses: Sequence[str], timestamp: datetime):
+        """Record the current status of every space and end the history of spaces no longer present."""
+        for space_id, status in zip(space_ids, statuses):
+            self.record(space_id, status, timestamp)
+        now = to_epoch(timestamp)
+        present = set(space_ids)
+        with self._lock:
+            for space_id in [space_id for space_id in self.open if space_id not in present]:
+                status, start = self.open.pop(space_id)
+                if now > start:
+                    self._closed.append((space_id, status, start, now))
+                self._dirty[space_id] = None
+
+    def on_status_changed(self, event):
+        """Event bus handler for SpaceStatusChanged."""
+        self.record(event.space_id, event.new_status, event.timestamp)
+
+    def flush(self, timestamp: Optional[datetime] = None):
+        """Write buffered segments and rollups in one transaction and update the heartbeat."""
+        with self._lock:
+            closed, self._closed = self._closed, []
+            dirty, self._dirty = self._dirty, {}
+        now = to_epoch(timestamp or datetime.now())
+        try:
+            with self.pool.transaction('flush_occupancy_history') as conn:
+                conn.executemany("INSERT INTO occupancy_segments VALUES (?, ?, ?, ?)", closed)
+                for table, bucket, seconds in ROLLUPS:
+                    conn.executemany(f"""
+                        INSERT INTO {table} ({bucket}, space_id, occupied_seconds, booked_seconds)
+                        VALUES (?, ?, ?, ?)
+                        ON CONFLICT ({bucket}, space_id) DO UPDATE SET
+                            occupied_seconds = occupied_seconds + excluded.occupied_seconds,
+                            booked_seconds = booked_seconds + excluded.booked_seconds
+                    """, rollup_rows(closed, seconds))
+                conn.executemany("DELETE FROM occupancy_open WHERE space_id = ?",
+                                 [(space_id,) for space_id, segment in dirty.items() if segment is None])
+                conn.executemany("INSERT OR REPLACE INTO occupancy_open VALUES (?, ?, ?)",
+                                 [(space_id, *segment) for space_id, segment in dirty.items()
+                                  if segment is not None])
+                conn.execute("INSERT OR REPLACE INTO occupancy_heartbeat VALUES (0, ?)", (now,))
+        except sqlite3.Error as e:
+            print(f"Error writing occupancy history: {e}")
+            with self._lock:
+                # Keep the data for the next flush; newer open segments win
+                self._closed = closed + self._closed
+                self._dirty = {**dirty, **self._dirty}
+
+    def status_seconds(self, start_time: datetime, end_time: datetime,
+                       status: str = "occupied") -> Dict[str, int]:
+        """Seconds each space spent in ``status`` ("occupied" or "booked") between two times.
+
+        The range is taken to whole minutes. Whole hours come from the hour
+        rollup, the ragged ends from the minute rollup, and still-open
+        segments are added from memory.
+        """
+        code = STATUS_CODES[status]
+        if code == FREE:
+            raise ValueError("Only occupied and booked time is rolled up")
+        column = 'occupied_seconds' if code == OCCUPIED else 'booked_seconds'
+        self.flush()
+        first_minute, last_minute = to_epoch(start_time) // 60, to_epoch(end_time) // 60
+        first_hour, last_hour = -(-first_minute // 60), last_minute // 60
+
+        totals: Dict[str, int] = {}
+        if first_hour < last_hour:
+            parts = [('occupancy_hours', 'hour', first_hour, last_hour),
+                     ('occupancy_minutes', 'minute', first_minute, first_hour * 60),
+                     ('occupancy_minutes', 'minute', last_hour * 60, last_minute)]
+        else:
+            parts = [('occupancy_minutes', 'minute', first_minute, last_minute)]
+        for table, bucket, low, high in parts:
+            if low >= high:
+                continue
+            for space_id, seconds in self.pool.query(f'{table}_range', f"""
+                SELECT space_id, SUM({column}) FROM {table}
+                WHERE {bucket} >= ? AND {bucket} < ?
+                GROUP BY space_id
+            """, (low, high)):
+                totals[space_id] = totals.get(space_id, 0) + seconds
+
+        range_start, range_end = first_minute * 60, last_minute * 60
+        now = to_epoch(datetime.now())
+        with self._lock:
+            open_segments = list(self.open.items())
+        for space_id, (segment_status, start) in open_segments:
+            seconds = min(now, range_end) - max(start, range_start)
+            if segment_status == code and seconds > 0:
+                totals[space_id] = totals.get(space_id, 0) + seconds
+        return totals
+
+    def utilization(self, start_time: datetime, end_time: datetime,
+                    status: str = "occupied") -> Dict[str, float]:
+        """Share of the range (0 to 1) each space spent in ``status``."""
+        span = (to_epoch(end_time) // 60 - to_epoch(start_time) // 60) * 60
+        if span <= 0:
+            return {}
+        return {space_id: seconds / span
+                for space_id, seconds in self.status_seconds(start_time, end_time, status).items()}
+
+    def segments(self, space_id: str, start_time: datetime,
+                 end_time: datetime) -> List[Tuple[str, datetime, datetime]]:
+        """The (status, start, end) runs of one space that overlap a time range, oldest first."""
+        self.flush()
+        start, end = to_epoch(start_time), to_epoch(end_time)
+        rows = self.pool.query('occupancy_segments_range', """
+            SELECT status, start_time, end_time FROM occupancy_segments
+            WHERE space_id = ? AND start_time < ? AND end_time > ?
+            ORDER BY start_time
+        """, (space_id, end, start))
+        runs = [(status, segment_start, segment_end) for status, segment_start, segment_end in rows]
+        with self._lock:
+            current = self.open.get(space_id)
+        if current is not None and current[1] < end:
+            runs.append((current[0], current[1], max(to_epoch(datetime.now()), current[1])))
+        return [(STATUS_NAMES[status], from_epoch(segment_start), from_epoch(segment_end))
+                for status, segment_start, segment_end in runs]
@@ -0,0 +1 @@
+"""Event stream package for parking system."""
\ No newline at end of file
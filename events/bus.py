@@ -0,0 +1,60 @@
+import asyncio
+import threading
+from typing import Awaitable, Callable, List, Optional, Tuple, Type
+from events.event_types import Event
+
+Handler = Callable[[Event], None]
+AsyncHandler = Callable[[Event], Awaitable[None]]
+
+
+class EventBus:
+    """In-process publish/subscribe for parking events.
+
+    Synchronous subscribers run on the publishing thread, in subscription
+    order. Asyncio subscribers are handed to their own event loop with
+    ``call_soon_threadsafe``, so publishing never blocks on them. A
+    subscription to a base class (e.g. ``SpaceStatusChanged``) also receives
+    its subclasses.
+    """
+
+    def __init__(self):
+        self._subscribers: List[Tuple[Type[Event], Handler]] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, event_type: Type[Event], handler: Handler) -> Callable[[], None]:
+        """Call ``handler`` for every published ``event_type``; returns an unsubscribe function."""
+        entry = (event_type, handler)
+        with self._lock:
+            self._subscribers = self._subscribers + [entry]
+
+        def unsubscribe():
+            with self._lock:
+                self._subscribers = [item for item in self._subscribers if item is not entry]
+        return unsubscribe
+
+    def subscribe_async(self, event_type: Type[Event], handler: AsyncHandler,
+                        loop: Optional[asyncio.AbstractEventLoop] = None) -> Callable[[], None]:
+        """Run coroutine ``handler`` on ``loop`` (default: the running loop) for each event."""
+        loop = loop if loop is not None else asyncio.get_running_loop()
+
+        def dispatch(event: Event):
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(lambda: loop.create_task(handler(event)))
+        return self.subscribe(event_type, dispatch)
+
+    def publish(self, event: Event):
+        """Deliver ``event`` to every matching subscriber.
+
+        A failing subscriber is reported and skipped so it cannot starve the others.
+        """
+        for event_type, handler in self._subscribers:
+            if isinstance(event, event_type):
+                try:
+                    handler(event)
+                except Exception as e:
+                    print(f"Error in event subscriber for {type(event).__name__}: {e}")
+
+    def publish_all(self, events: List[Event]):
+        """Publish several events in order."""
+        for event in events:
+            self.publish(event)
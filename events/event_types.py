@@ -0,0 +1,61 @@
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+
+@dataclass(frozen=True)
+class Event:
+    """Base class for everything published on the event bus."""
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-ready form: the event's type name plus its fields, datetimes as ISO strings."""
+        data = {key: value.isoformat() if isinstance(value, datetime) else value
+                for key, value in asdict(self).items()}
+        data['type'] = type(self).__name__
+        return data
+
+
+@dataclass(frozen=True)
+class SpaceStatusChanged(Event):
+    """A space moved between "free", "booked" and "occupied"."""
+    space_id: str
+    old_status: str
+    new_status: str
+    timestamp: datetime = field(default_factory=datetime.now)
+
+
+@dataclass(frozen=True)
+class SpaceOccupied(SpaceStatusChanged):
+    """A vehicle was detected in a space that was not occupied."""
+
+
+@dataclass(frozen=True)
+class SpaceFreed(SpaceStatusChanged):
+    """An occupied space is no longer occupied; ``new_status`` says if it is booked."""
+
+
+@dataclass(frozen=True)
+class BookingCreated(Event):
+    """A booking was stored for a space."""
+    booking_id: int
+    space_id: str
+    start_time: datetime
+    end_time: datetime
+    timestamp: datetime = field(default_factory=datetime.now)
+
+
+@dataclass(frozen=True)
+class BookingExpired(Event):
+    """A booking reached its end time and was deactivated."""
+    booking_id: int
+    space_id: Optional[str]
+    timestamp: datetime = field(default_factory=datetime.now)
+
+
+def status_change(space_id: str, old_status: str, new_status: str) -> SpaceStatusChanged:
+    """The most specific event for a space's status change."""
+    if new_status == "occupied":
+        return SpaceOccupied(space_id, old_status, new_status)
+    if old_status == "occupied":
+        return SpaceFreed(space_id, old_status, new_status)
+    return SpaceStatusChanged(space_id, old_status, new_status)
@@ -0,0 +1,127 @@
+import json
+import queue
+import socket
+import threading
+from typing import List, Optional, Type
+from events.bus import EventBus
+from events.event_types import Event
+
+
+class _Client:
+    """One connected listener, fed from its own bounded queue by a sender thread."""
+
+    def __init__(self, conn: socket.socket, max_pending: int):
+        self.conn = conn
+        self.pending: queue.Queue = queue.Queue(maxsize=max_pending)
+        self.closed = False
+        self.thread = threading.Thread(target=self._send_loop, name="event-client", daemon=True)
+
+    def offer(self, line: bytes) -> bool:
+        """Queue a line for sending; False if the client is too far behind or gone."""
+        if self.closed:
+            return False
+        try:
+            self.pending.put_nowait(line)
+            return True
+        except queue.Full:
+            return False
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            try:
+                self.pending.put_nowait(None)  # Wake the sender so it exits
+            except queue.Full:
+                pass  # Its next send fails on the closed socket instead
+            try:
+                self.conn.close()
+            except OSError:
+                pass
+
+    def _send_loop(self):
+        while True:
+            line = self.pending.get()
+            if line is None or self.closed:
+                return
+            try:
+                self.conn.sendall(line)
+            except OSError:
+                self.close()
+                return
+
+
+class EventSocketPublisher:
+    """Streams bus events to local TCP clients as JSON lines.
+
+    Listens on localhost only. Every event is serialized once and queued for
+    each client; a client that falls ``max_pending`` events behind is
+    disconnected rather than slowing down the publisher.
+    """
+
+    def __init__(self, bus: EventBus, port: int, host: str = '127.0.0.1',
+                 event_type: Type[Event] = Event, max_pending: int = 1000):
+        self.bus = bus
+        self.host = host
+        self.port = port
+        self.event_type = event_type
+        self.max_pending = max_pending
+        self._clients: List[_Client] = []
+        self._lock = threading.Lock()
+        self._server: Optional[socket.socket] = None
+        self._thread: Optional[threading.Thread] = None
+        self._unsubscribe = None
+
+    @property
+    def address(self):
+        """(host, port) actually bound; useful when started with port 0."""
+        return self._server.getsockname() if self._server is not None else (self.host, self.port)
+
+    def start(self):
+        """Bind the listening socket, subscribe to the bus and start accepting clients."""
+        self._server = socket.create_server((self.host, self.port))
+        self._unsubscribe = self.bus.subscribe(self.event_type, self.send)
+        self._thread = threading.Thread(target=self._accept_loop, name="event-publisher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop accepting, disconnect every client and unsubscribe from the bus."""
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+        if self._server is not None:
+            try:
+                self._server.shutdown(socket.SHUT_RDWR)  # Wakes the blocked accept() on Linux
+            except OSError:
+                pass
+            self._server.close()
+            self._server = None
+        with self._lock:
+            clients, self._clients = self._clients, []
+        for client in clients:
+            client.close()
+
+    def send(self, event: Event):
+        """Queue ``event`` for every connected client."""
+        with self._lock:
+            clients = self._clients
+        if not clients:
+            return
+        line = (json.dumps(event.to_dict()) + "\n").encode()
+        dropped = [client for client in clients if not client.offer(line)]
+        if dropped:
+            for client in dropped:
+                client.close()
+            with self._lock:
+                self._clients = [client for client in self._clients if not client.closed]
+
+    def _accept_loop(self):
+        server = self._server
+        while True:
+            try:
+                conn, _ = server.accept()
+            except OSError:
+                return  # Server socket closed by stop()
+            client = _Client(conn, self.max_pending)
+            client.thread.start()
+            with self._lock:
+                self._clients = self._clients + [client]
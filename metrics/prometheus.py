@@ -0,0 +1,41 @@
+import os
+from typing import List
+from metrics.registry import BUCKET_BOUNDS_MS, MetricsRegistry
+
+
+def label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render(registry: MetricsRegistry, prefix: str = 'parking') -> str:
+    """The registry in the Prometheus text exposition format, latencies in seconds."""
+    histograms, counters = registry.snapshot()
+    lines: List[str] = [
+        f"# HELP {prefix}_stage_latency_seconds Time spent per instrumented stage.",
+        f"# TYPE {prefix}_stage_latency_seconds histogram",
+    ]
+    bounds = [f"{bound / 1000.0:g}" for bound in BUCKET_BOUNDS_MS] + ["+Inf"]
+    for name in sorted(histograms):
+        counts, sum_ms, count = histograms[name]
+        stage = label(name)
+        cumulative = 0
+        for bound, bucket_count in zip(bounds, counts):
+            cumulative += bucket_count
+            lines.append(f'{prefix}_stage_latency_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+        lines.append(f'{prefix}_stage_latency_seconds_sum{{stage="{stage}"}} {sum_ms / 1000.0:.6f}')
+        lines.append(f'{prefix}_stage_latency_seconds_count{{stage="{stage}"}} {count}')
+    lines += [
+        f"# HELP {prefix}_events_total Events counted since startup.",
+        f"# TYPE {prefix}_events_total counter",
+    ]
+    for name in sorted(counters):
+        lines.append(f'{prefix}_events_total{{name="{label(name)}"}} {counters[name]}')
+    return "\n".join(lines) + "\n"
+
+
+def write_file(registry: MetricsRegistry, path: str):
+    """Write the metrics to ``path`` atomically, for a node-exporter style textfile collector."""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w') as f:
+        f.write(render(registry))
+    os.replace(temp_path, path)
@@ -0,0 +1,175 @@
+import bisect
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, List, Tuple
+
+# Upper bucket bounds in milliseconds; one more bucket holds everything slower
+BUCKET_BOUNDS_MS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 500.0, 1000.0, 2500.0)
+
+
+@dataclass
+class StageStats:
+    """Recent behaviour of one instrumented stage, for display."""
+    name: str
+    count: int  # Calls since startup
+    rate: float  # Calls per second over the window
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float  # Slowest call in the window
+
+
+class _Slice:
+    """Bucket counts for one slice of the rolling window."""
+    __slots__ = ('index', 'counts', 'max_ms')
+
+    def __init__(self, index: int):
+        self.index = index
+        self.counts = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.max_ms = 0.0
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram, cumulative since startup and over a rolling window.
+
+    The cumulative counts feed the metrics file; the window, kept as a few
+    time slices that expire whole, feeds the live percentiles.
+    """
+
+    def __init__(self, window: float = 60.0, slices: int = 6, clock: Callable[[], float] = time.monotonic):
+        self.window = window
+        self.slice_seconds = window / slices
+        self.clock = clock
+        self.counts = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.sum_ms = 0.0
+        self.count = 0
+        self._slices: Deque[_Slice] = deque(maxlen=slices)
+
+    def observe(self, elapsed_ms: float):
+        bucket = bisect.bisect_left(BUCKET_BOUNDS_MS, elapsed_ms)
+        self.counts[bucket] += 1
+        self.sum_ms += elapsed_ms
+        self.count += 1
+        index = int(self.clock() / self.slice_seconds)
+        if not self._slices or self._slices[-1].index != index:
+            self._slices.append(_Slice(index))
+        current = self._slices[-1]
+        current.counts[bucket] += 1
+        if elapsed_ms > current.max_ms:
+            current.max_ms = elapsed_ms
+
+    def recent(self) -> Tuple[List[int], float]:
+        """Bucket counts and the maximum over the window."""
+        oldest = int(self.clock() / self.slice_seconds) - self._slices.maxlen + 1
+        counts = [0] * len(self.counts)
+        max_ms = 0.0
+        for piece in self._slices:
+            if piece.index >= oldest:
+                counts = [a + b for a, b in zip(counts, piece.counts)]
+                max_ms = max(max_ms, piece.max_ms)
+        return counts, max_ms
+
+    def stats(self, name: str) -> StageStats:
+        counts, max_ms = self.recent()
+        total = sum(counts)
+        return StageStats(name, self.count, total / self.window,
+                          percentile(counts, 0.50, max_ms), percentile(counts, 0.95, max_ms),
+                          percentile(counts, 0.99, max_ms), max_ms)
+
+
+def percentile(counts: List[int], q: float, max_ms: float) -> float:
+    """Estimate a percentile from bucket counts, interpolating inside the bucket."""
+    total = sum(counts)
+    if total == 0:
+        return 0.0
+    target = q * total
+    seen = 0
+    for bucket, count in enumerate(counts):
+        if count and seen + count >= target:
+            lower = BUCKET_BOUNDS_MS[bucket - 1] if bucket > 0 else 0.0
+            upper = BUCKET_BOUNDS_MS[bucket] if bucket < len(BUCKET_BOUNDS_MS) else max_ms
+            return min(lower + (upper - lower) * (target - seen) / count, max_ms)
+        seen += count
+    return max_ms
+
+
+class _NullTimer:
+    """Context manager that does nothing; handed out while metrics are disabled."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ('registry', 'name', 'start')
+
+    def __init__(self, registry: 'MetricsRegistry', name: str):
+        self.registry = registry
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.registry.observe(self.name, (time.perf_counter() - self.start) * 1000.0)
+        return False
+
+
+class MetricsRegistry:
+    """Named latency histograms and counters shared by the UI, pipeline and database.
+
+    While disabled, ``timer`` returns a shared no-op context manager and
+    ``observe``/``increment`` return at once, so instrumented code costs an
+    attribute check per stage.
+    """
+
+    def __init__(self, enabled: bool = False, window: float = 60.0):
+        self.enabled = enabled
+        self.window = window
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def timer(self, name: str):
+        """Time the enclosed block into histogram ``name``."""
+        if not self.enabled:
+            return NULL_TIMER
+        return _Timer(self, name)
+
+    def observe(self, name: str, elapsed_ms: float):
+        """Record one call of ``name`` that took ``elapsed_ms``."""
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = LatencyHistogram(self.window)
+            histogram.observe(elapsed_ms)
+
+    def increment(self, name: str, amount: int = 1):
+        """Add ``amount`` to counter ``name``."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def stage_stats(self) -> List[StageStats]:
+        """Windowed statistics for every histogram, sorted by name."""
+        with self._lock:
+            return [self.histograms[name].stats(name) for name in sorted(self.histograms)]
+
+    def snapshot(self) -> Tuple[Dict[str, Tuple[List[int], float, int]], Dict[str, int]]:
+        """Cumulative (bucket counts, sum in ms, count) per histogram, and the counters."""
+        with self._lock:
+            histograms = {name: (list(h.counts), h.sum_ms, h.count) for name, h in self.histograms.items()}
+            return histograms, dict(self.counters)
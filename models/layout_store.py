@@ -0,0 +1,103 @@
+import os
+import pickle
+import struct
+from typing import Optional, Tuple
+import numpy as np
+
+# File layout: magic, format version, reserved, space count, then count rows of
+# little-endian int32 (x, y, width, height)
+MAGIC = b'SPLY'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sHHI')
+RECT_DTYPE = np.dtype('<i4')
+
+
+class LayoutError(ValueError):
+    """Raised when a layout file is malformed or has an unsupported version."""
+
+
+def empty_rects() -> np.ndarray:
+    return np.zeros((0, 4), dtype=np.int32)
+
+
+def import_pickle(path: str) -> np.ndarray:
+    """Read a legacy pickled [(pos, size), ...] layout into an (N, 4) rect array."""
+    with open(path, 'rb') as f:
+        try:
+            data = pickle.load(f)
+        except (pickle.UnpicklingError, EOFError, AttributeError, ValueError) as e:
+            raise LayoutError(f"Could not read legacy layout '{path}': {e}") from e
+    try:
+        rects = np.array([(pos[0], pos[1], size[0], size[1]) for pos, size in data],
+                         dtype=np.int32)
+    except (TypeError, ValueError, IndexError) as e:
+        raise LayoutError(f"Unexpected legacy layout contents in '{path}': {e}") from e
+    return rects.reshape(-1, 4)
+
+
+class LayoutStore:
+    """Loads and saves the space layout, re-reading the file only when it changes.
+
+    The on-disk format is a small versioned header followed by a packed int32
+    array, so loading is a single read plus ``np.frombuffer``. If the layout file
+    does not exist yet it is created from the legacy pickle file.
+    """
+
+    def __init__(self, path: str = 'CarParkPos.bin', legacy_path: Optional[str] = 'CarParkPos'):
+        self.path = path
+        self.legacy_path = legacy_path
+        self._rects = empty_rects()
+        self._key: Optional[Tuple[int, int]] = None
+
+    def _stat_key(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def load(self) -> np.ndarray:
+        """Return the (N, 4) int32 rect array, cached until the file changes.
+
+        The same array object is returned while the file is unchanged, so callers
+        can compare by identity to detect a new layout.
+        """
+        key = self._stat_key()
+        if key is None:
+            if self.legacy_path and os.path.exists(self.legacy_path):
+                self.save(import_pickle(self.legacy_path))
+                return self._rects
+            if self._key is not None:
+                self._rects, self._key = empty_rects(), None
+            return self._rects
+        if key != self._key:
+            with open(self.path, 'rb') as f:
+                self._rects = self.parse(f.read())
+            self._key = key
+        return self._rects
+
+    @staticmethod
+    def parse(data: bytes) -> np.ndarray:
+        """Parse the bytes of a layout file into a read-only (N, 4) rect array."""
+        if len(data) < HEADER.size:
+            raise LayoutError("Layout file is truncated")
+        magic, version, _, count = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise LayoutError("Not a parking layout file")
+        if version != FORMAT_VERSION:
+            raise LayoutError(f"Unsupported layout format version {version}")
+        if len(data) != HEADER.size + count * 4 * RECT_DTYPE.itemsize:
+            raise LayoutError("Layout file size does not match its space count")
+        return np.frombuffer(data, dtype=RECT_DTYPE, offset=HEADER.size).reshape(count, 4)
+
+    def save(self, rects: np.ndarray):
+        """Write the rect array atomically and update the cache."""
+        rects = np.array(rects, dtype=RECT_DTYPE).reshape(-1, 4)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(rects)))
+            f.write(rects.tobytes())
+        os.replace(tmp_path, self.path)
+        self._rects = rects
+        self._rects.flags.writeable = False
+        self._key = self._stat_key()
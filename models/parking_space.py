@@ -1,11 +1,165 @@
-from dataclasses import dataclass
-from typing import Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+
+STATUS_NAMES = ("free", "booked", "occupied")
+FREE, BOOKED, OCCUPIED = range(len(STATUS_NAMES))
+STATUS_CODES: Dict[str, int] = {name: code for code, name in enumerate(STATUS_NAMES)}
+
+
+def status_codes(occupied: np.ndarray, booked: np.ndarray) -> np.ndarray:
+    """Status code per space from occupancy and booking flags; occupancy wins."""
+    return np.where(occupied, OCCUPIED, np.where(booked, BOOKED, FREE)).astype(np.int8)
+
+
+class SpaceTable:
+    """Every parking space as parallel arrays: ids, (x, y, width, height) rects and status codes.
+
+    Bulk work (counting, filtering by status, drawing, detection) runs on the
+    arrays directly; ``table[i]`` gives a ParkingSpace view for code that wants
+    one space at a time.
+    """
+
+    def __init__(self, ids: Sequence[str] = (), rects: Optional[np.ndarray] = None,
+                 status: Optional[np.ndarray] = None):
+        self.ids: List[str] = list(ids)
+        self.rects = (np.array(rects, dtype=np.int32).reshape(-1, 4) if rects is not None
+                      else np.zeros((0, 4), dtype=np.int32))
+        if len(self.rects) != len(self.ids):
+            raise ValueError("Every space needs exactly one rectangle")
+        self.status = (np.array(status, dtype=np.int8) if status is not None
+                       else np.full(len(self.ids), FREE, dtype=np.int8))
+        self.index: Dict[str, int] = {space_id: i for i, space_id in enumerate(self.ids)}
+
+    @property
+    def positions(self) -> np.ndarray:
+        return self.rects[:, :2]
+
+    @property
+    def sizes(self) -> np.ndarray:
+        return self.rects[:, 2:]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, i: int) -> 'ParkingSpace':
+        if not -len(self) <= i < len(self):
+            raise IndexError(i)
+        return ParkingSpace(self, i % len(self))
+
+    def __iter__(self) -> Iterator['ParkingSpace']:
+        return (ParkingSpace(self, i) for i in range(len(self)))
+
+    def counts(self) -> Dict[str, int]:
+        """Number of spaces per status name."""
+        counts = np.bincount(self.status, minlength=len(STATUS_NAMES))
+        return {name: int(counts[code]) for code, name in enumerate(STATUS_NAMES)}
+
+    def ids_with_status(self, code: int) -> List[str]:
+        """Ids of the spaces whose status is ``code``, in table order."""
+        return [self.ids[i] for i in np.flatnonzero(self.status == code)]
+
+    def status_names(self) -> List[str]:
+        return [STATUS_NAMES[code] for code in self.status.tolist()]
+
+    def mask(self, space_ids: Iterable[str]) -> np.ndarray:
+        """Boolean array marking the given spaces; unknown ids are ignored."""
+        mask = np.zeros(len(self), dtype=bool)
+        indices = [self.index[space_id] for space_id in space_ids if space_id in self.index]
+        mask[indices] = True
+        return mask
+
+    def set_status(self, codes: np.ndarray, start: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+        """Write ``codes`` over the spaces from ``start`` on.
+
+        Returns the indices that changed and their previous codes.
+        """
+        current = self.status[start:start + len(codes)]
+        changed = np.flatnonzero(current != codes)
+        previous = current[changed].copy()
+        current[changed] = np.asarray(codes)[changed]
+        return changed + start, previous
+
+    def append(self, space_id: str, rect: Sequence[int]) -> 'ParkingSpace':
+        """Add a free space at the end of the table."""
+        self.ids.append(space_id)
+        self.index[space_id] = len(self.ids) - 1
+        self.rects = np.vstack([self.rects, np.asarray(rect, dtype=np.int32).reshape(1, 4)])
+        self.status = np.append(self.status, np.int8(FREE))
+        return self[len(self) - 1]
+
+    def pop(self, i: int):
+        """Remove the space at index ``i``."""
+        del self.ids[i]
+        self.rects = np.delete(self.rects, i, axis=0)
+        self.status = np.delete(self.status, i)
+        self.index = {space_id: j for j, space_id in enumerate(self.ids)}
+
+    def rename(self, i: int, space_id: str):
+        """Give the space at index ``i`` a new id."""
+        if self.index.get(self.ids[i]) == i:
+            del self.index[self.ids[i]]
+        self.ids[i] = space_id
+        self.index[space_id] = i
+
 
-@dataclass
 class ParkingSpace:
-    id: str
-    position: Tuple[int, int]
-    size: Tuple[int, int]
-    status: str = "free"  # can be "free", "booked", or "occupied"
-    is_occupied: bool = False
-    is_booked: bool = False 
\ No newline at end of file
+    """A view of one row of a SpaceTable; reads and writes go straight to the arrays."""
+    __slots__ = ('table', 'i')
+
+    def __init__(self, table: SpaceTable, i: int):
+        self.table = table
+        self.i = i
+
+    @property
+    def id(self) -> str:
+        return self.table.ids[self.i]
+
+    @id.setter
+    def id(self, space_id: str):
+        self.table.rename(self.i, space_id)
+
+    @property
+    def position(self) -> Tuple[int, int]:
+        x, y = self.table.rects[self.i, :2].tolist()
+        return x, y
+
+    @position.setter
+    def position(self, position: Tuple[int, int]):
+        self.table.rects[self.i, :2] = position
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        width, height = self.table.rects[self.i, 2:].tolist()
+        return width, height
+
+    @size.setter
+    def size(self, size: Tuple[int, int]):
+        self.table.rects[self.i, 2:] = size
+
+    @property
+    def width(self) -> int:
+        return int(self.table.rects[self.i, 2])
+
+    @width.setter
+    def width(self, width: int):
+        self.table.rects[self.i, 2] = width
+
+    @property
+    def height(self) -> int:
+        return int(self.table.rects[self.i, 3])
+
+    @height.setter
+    def height(self, height: int):
+        self.table.rects[self.i, 3] = height
+
+    @property
+    def status(self) -> str:
+        """One of "free", "booked" or "occupied"."""
+        return STATUS_NAMES[self.table.status[self.i]]
+
+    @status.setter
+    def status(self, status: str):
+        self.table.status[self.i] = STATUS_CODES[status]
+
+    def __repr__(self) -> str:
+        return f"ParkingSpace(id={self.id!r}, position={self.position}, size={self.size}, status={self.status!r})"
@@ -1,38 +1,84 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 import cv2
-import pickle
 import numpy as np
 from datetime import datetime, timedelta
 import sqlite3
-from PIL import Image, ImageTk
 import threading
+import queue
 import time
 import os
-from parkingspacepicker import ParkingSpace, ParkingSpacePicker
-from models.parking_space import ParkingSpace
-from database.db_manager import DatabaseManager
+from parkingspacepicker import ParkingSpacePicker
+from models.parking_space import FREE, STATUS_NAMES, SpaceTable, status_codes
+from models.layout_store import LayoutStore, LayoutError
+from database.db_manager import BookingRequest, DatabaseManager
+from database.booking_import import read_booking_csv
+from database.occupancy_history import OccupancyHistory
 from video.video_processor import VideoProcessor
+from video.pipeline import DetectionPipeline
+from video.scheduler import FrameScheduler
+from video.shared_pipeline import SharedFramePipeline
+from video.cameras import CameraRegistry
+from video.process_backend import ProcessDetectionBackend
 from tabs.monitor_tab import MonitorTab
 from tabs.booking_tab import BookingTab
 from tabs.admin_tab import AdminTab
+from events.bus import EventBus
+from events.event_types import BookingCreated, BookingExpired, Event, SpaceStatusChanged, status_change
+from events.socket_publisher import EventSocketPublisher
+from metrics import prometheus
+from metrics.registry import MetricsRegistry
 
 class ParkingSystem:
+    RATES_REFRESH_INTERVAL = 1.0  # Seconds between frame rate updates when no status changed
+    HISTORY_FLUSH_INTERVAL = 10.0  # Seconds between occupancy history writes
+    METRICS_REFRESH_INTERVAL = 2.0  # Seconds between performance panel and metrics file updates
+
     def __init__(self, root):
         self.root = root
         self.root.title("Smart Parking System")
         self.root.state('zoomed')  # Maximize window
         
-        # Check if video file exists
-        if not os.path.exists('carPark.mp4'):
-            messagebox.showerror("Error", "Video file 'carPark.mp4' not found!")
+        # Load the camera registry; the first camera is the one shown in the monitor
+        try:
+            self.cameras = CameraRegistry.load()
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", f"Could not load camera registry: {e}")
+            self.root.destroy()
+            return
+        primary = self.cameras.primary
+        
+        # Check if video files exist
+        missing = [camera.video_path for camera in self.cameras if not os.path.exists(camera.video_path)]
+        if missing:
+            messagebox.showerror("Error", f"Video file '{missing[0]}' not found!")
             self.root.destroy()
             return
 
         # Initialize components
-        self.db_manager = DatabaseManager()
-        self.video_processor = VideoProcessor('carPark.mp4')
-        self.spaces = []
+        self.events = EventBus()
+        self.event_publisher = (EventSocketPublisher(self.events, self.cameras.event_port)
+                                if self.cameras.event_port is not None else None)
+        self.metrics = MetricsRegistry(enabled=self.cameras.metrics)
+        if self.metrics.enabled:
+            self.events.subscribe(Event, self.count_event)
+        self.db_manager = DatabaseManager(metrics=self.metrics)
+        self.occupancy_history = OccupancyHistory(self.db_manager.pool)
+        self.occupancy_history.recover()
+        self.events.subscribe(SpaceStatusChanged, self.occupancy_history.on_status_changed)
+        self.video_processor = VideoProcessor(primary.video_path)
+        scheduler = FrameScheduler(self.cameras.detect_fps, self.cameras.display_fps, metrics=self.metrics)
+        pipeline_class = SharedFramePipeline if self.cameras.process_pipeline else DetectionPipeline
+        self.pipeline = pipeline_class(self.video_processor, self.db_manager.get_booked_spaces, scheduler)
+        # Every other camera is decoded and detected in worker processes
+        self.detection_backend = ProcessDetectionBackend(self.cameras.cameras[1:])
+        self.layout_stores = {camera.camera_id: LayoutStore(camera.layout_path, camera.legacy_layout_path)
+                              for camera in self.cameras}
+        self.camera_rects = {}
+        self.camera_slices = {}
+        self.camera_occupancy = {}  # Last tracked occupancy per camera, before bookings
+        self.spaces = SpaceTable()
+        self.space_rects = self.spaces.rects
         
         # Load parking spaces
         self.load_spaces()
@@ -46,7 +92,7 @@ class ParkingSystem:
         
         # Initialize tab modules
         self.monitor_tab = MonitorTab(ttk.Frame(self.tab_control))
-        self.booking_tab = BookingTab(ttk.Frame(self.tab_control), self.db_manager)
+        self.booking_tab = BookingTab(ttk.Frame(self.tab_control), self.db_manager, self.metrics)
         self.admin_tab = AdminTab(ttk.Frame(self.tab_control), self.db_manager)
         
         # Add tabs to notebook
@@ -57,9 +103,29 @@ class ParkingSystem:
         
         # Set up event handlers
         self.setup_event_handlers()
+        self.subscribe_tabs()
+        self.monitor_tab.update_status(self.spaces)
+        self.update_booking_spaces()
         
         # Start update timers
         self.update_bookings()
+        self.flush_occupancy_history()
+        self.admin_tab.set_performance_enabled(self.metrics.enabled)
+        if self.metrics.enabled:
+            self.refresh_metrics()
+        self.expired_bookings = queue.SimpleQueue()
+        self.status_refreshed = 0.0
+        self.db_manager.start_expiry_scheduler(self.expired_bookings.put)
+        self.pipeline.start()
+        self.detection_backend.start()
+        if self.event_publisher is not None:
+            # Streaming events is optional; run without it if the port is taken
+            try:
+                self.event_publisher.start()
+            except OSError as e:
+                messagebox.showerror("Error", f"Could not publish events on port "
+                                              f"{self.cameras.event_port}: {e}")
+                self.event_publisher = None
         self.update_video()
         
         # Bind cleanup to window close
@@ -87,19 +153,60 @@ class ParkingSystem:
         self.conn.commit()
 
     def load_spaces(self):
-        """Load parking spaces from file."""
-        try:
-            with open('CarParkPos', 'rb') as f:
-                data = pickle.load(f)
-                self.spaces = []
-                for i, (pos, size) in enumerate(data):
-                    self.spaces.append(ParkingSpace(
-                        id=f"P{i+1:03d}",
-                        position=pos,
-                        size=size
-                    ))
-        except:
-            self.spaces = []
+        """Load every camera's parking spaces, rebuilding only layouts whose file changed."""
+        changed = False
+        for camera in self.cameras:
+            try:
+                rects = self.layout_stores[camera.camera_id].load()
+            except (OSError, LayoutError) as e:
+                print(f"Error loading parking spaces for camera {camera.camera_id}: {e}")
+                continue
+            if rects is self.camera_rects.get(camera.camera_id):
+                continue
+            self.camera_rects[camera.camera_id] = rects
+            changed = True
+        
+        if changed:
+            self.rebuild_space_table()
+
+    def rebuild_space_table(self):
+        """Lay every camera's spaces out in one table, primary camera first.
+
+        Cameras whose layout did not change keep their spaces' statuses. The
+        others start free, then take the worker's latest report if it already
+        matches the new layout, since workers only report again when a space flips.
+        """
+        old_table, old_slices = self.spaces, self.camera_slices
+        ids, rects, statuses = [], [], []
+        slices = {}
+        reset = []
+        for camera in self.cameras:
+            camera_rects = self.camera_rects.get(camera.camera_id, np.zeros((0, 4), dtype=np.int32))
+            start = len(ids)
+            slices[camera.camera_id] = slice(start, start + len(camera_rects))
+            ids.extend(camera.space_id(i) for i in range(len(camera_rects)))
+            rects.append(camera_rects)
+            old = old_slices.get(camera.camera_id)
+            if (old is not None and old.stop - old.start == len(camera_rects)
+                    and np.array_equal(old_table.rects[old], camera_rects)):
+                statuses.append(old_table.status[old])
+            else:
+                statuses.append(np.full(len(camera_rects), FREE, dtype=np.int8))
+                self.camera_occupancy.pop(camera.camera_id, None)
+                reset.append(camera.camera_id)
+        self.spaces = SpaceTable(ids, np.concatenate(rects), np.concatenate(statuses))
+        self.camera_slices = slices
+        self.occupancy_history.sync(self.spaces.ids, self.spaces.status_names(), datetime.now())
+        for camera_id in reset:
+            latest = self.detection_backend.latest.get(camera_id)
+            if latest is not None:
+                self.apply_occupancy(camera_id, latest.occupied)
+
+        primary = self.cameras.primary.camera_id
+        rects = self.camera_rects.get(primary)
+        if rects is not None and rects is not self.space_rects:
+            self.space_rects = rects
+            self.pipeline.set_layout(self.spaces.ids[slices[primary]], rects)
 
     def setup_event_handlers(self):
         """Set up event handlers for all components."""
@@ -108,6 +215,7 @@ class ParkingSystem:
         
         # Booking tab
         self.booking_tab.set_book_command(self.book_space)
+        self.booking_tab.set_import_command(self.import_bookings)
         self.booking_tab.set_cancel_command(self.cancel_booking)
         self.booking_tab.set_refresh_commands(self.refresh_bookings)
         
@@ -115,10 +223,16 @@ class ParkingSystem:
         self.admin_tab.set_picker_command(self.launch_space_picker)
         self.admin_tab.set_refresh_command(self.refresh_spaces)
 
+    def subscribe_tabs(self):
+        """Let the tabs follow status and booking events instead of rescanning every space."""
+        for tab in (self.monitor_tab, self.booking_tab, self.admin_tab):
+            self.events.subscribe(SpaceStatusChanged, tab.on_status_changed)
+        self.events.subscribe(BookingCreated, self.admin_tab.on_booking_created)
+
     def toggle_pause(self):
         """Toggle video pause state."""
-        self.video_processor.toggle_pause()
-        text = "Resume" if self.video_processor.is_paused else "Pause"
+        paused = self.pipeline.toggle_pause()
+        text = "Resume" if paused else "Pause"
         self.monitor_tab.pause_button.configure(text=text)
 
     def book_space(self):
@@ -142,24 +256,61 @@ class ParkingSystem:
             minutes=form_data['minutes']
         )
         
-        success = self.db_manager.create_booking(
-            form_data['space_id'],
-            form_data['name'],
-            form_data['email'],
-            form_data['license_plate'],
-            start_time,
-            end_time
-        )
-        
-        if success:
+        request = BookingRequest(form_data['space_id'], form_data['name'], form_data['email'],
+                                 form_data['license_plate'], start_time, end_time)
+        result = self.db_manager.create_bookings([request])[0]
+
+        if result.ok:
+            self.events.publish(BookingCreated(result.booking_id, form_data['space_id'], start_time, end_time))
             self.booking_tab.clear_form()
             messagebox.showinfo(
                 "Success", 
                 f"Space {form_data['space_id']} booked until {end_time.strftime('%Y-%m-%d %H:%M')}"
             )
             self.refresh_spaces()
+        elif result.conflict_id is not None:
+            messagebox.showerror(
+                "Error",
+                f"Space {form_data['space_id']} is already booked for that time (booking {result.conflict_id})"
+            )
         else:
-            messagebox.showerror("Error", "Failed to create booking")
+            messagebox.showerror("Error", result.error or "Failed to create booking")
+
+    def import_bookings(self):
+        """Book every reservation in a CSV file in one atomic batch."""
+        path = filedialog.askopenfilename(title="Import Bookings",
+                                          filetypes=[("CSV files", "*.csv"), ("All files", "*.*")])
+        if not path:
+            return
+        try:
+            requests, problems = read_booking_csv(path)
+        except (OSError, UnicodeDecodeError) as e:
+            messagebox.showerror("Error", f"Could not read {path}: {e}")
+            return
+
+        results = self.db_manager.create_bookings(requests)
+        booked = 0
+        for result in results:
+            request = result.request
+            if result.ok:
+                booked += 1
+                self.events.publish(BookingCreated(result.booking_id, request.space_id,
+                                                   request.start_time, request.end_time))
+            elif result.conflict_id is not None:
+                problems.append(f"{request.space_id} {request.start_time:%Y-%m-%d %H:%M}: "
+                                f"overlaps booking {result.conflict_id}")
+            else:
+                problems.append(f"{request.space_id}: {result.error or 'failed'}")
+
+        summary = f"Booked {booked} of {len(results)} reservation(s)."
+        if problems:
+            shown = "\n".join(problems[:10])
+            more = f"\n...and {len(problems) - 10} more" if len(problems) > 10 else ""
+            messagebox.showwarning("Import Bookings", f"{summary}\n\n{shown}{more}")
+        else:
+            messagebox.showinfo("Import Bookings", summary)
+        if booked:
+            self.refresh_spaces()
 
     def cancel_booking(self):
         """Cancel the selected booking."""
@@ -187,37 +338,59 @@ class ParkingSystem:
 
     def refresh_spaces(self):
         """Refresh the parking space data."""
-        # Reload spaces
-        self.load_spaces()
-        
-        # Update space statuses
-        success, frame = self.video_processor.read_frame()
-        if success:
-            processed_frame = self.video_processor.process_frame(frame)
-            for space in self.spaces:
-                # Check physical occupancy
-                is_occupied = self.video_processor.check_space_occupancy(
-                    space.position, space.size, processed_frame
-                )
-                # Check booking status
-                is_booked = self.db_manager.is_space_booked(space.id, datetime.now())
-                
-                # Set status
-                if is_occupied:
-                    space.status = "occupied"
-                elif is_booked:
-                    space.status = "booked"
-                else:
-                    space.status = "free"
-
-        # Update displays
-        self.admin_tab.update_space_list(self.spaces)
-        self.update_booking_spaces()
+        metrics = self.metrics
+        with metrics.timer('refresh_spaces'):
+            # Reload spaces
+            with metrics.timer('refresh_spaces.load_spaces'):
+                self.load_spaces()
+            
+            # Re-apply bookings to every camera's last detected occupancy
+            with metrics.timer('refresh_spaces.update_statuses'):
+                self.reapply_bookings()
+
+            # Update displays; the layout may have changed, so recount everything
+            with metrics.timer('refresh_spaces.update_tabs'):
+                self.admin_tab.update_space_list(self.spaces)
+                self.monitor_tab.update_status(self.spaces, self.pipeline.scheduler.rates())
+                self.update_booking_spaces()
+
+    def reapply_bookings(self) -> bool:
+        """Re-resolve every camera's statuses from its last occupancy and the current bookings.
+
+        Occupancy comes from the detectors' trackers, so bookings and refreshes
+        never bypass their hysteresis. Returns True if any space's status changed.
+        """
+        changed = False
+        for camera_id, occupied in list(self.camera_occupancy.items()):
+            changed |= self.apply_occupancy(camera_id, occupied)
+        return changed
+
+    def apply_occupancy(self, camera_id: str, occupied: np.ndarray) -> bool:
+        """Set statuses for one camera's spaces from its occupancy flags and current bookings.
+
+        Returns True if any space's status changed. The occupancy is kept for
+        reapply_bookings; flags that do not match the camera's layout are ignored.
+        """
+        spaces = self.camera_slices.get(camera_id)
+        if spaces is None or len(occupied) != spaces.stop - spaces.start:
+            return False
+        self.camera_occupancy[camera_id] = occupied
+        booked_spaces = self.db_manager.get_booked_spaces(datetime.now())
+        booked = self.spaces.mask(booked_spaces)[self.camera_slices[camera_id]]
+        return self.set_statuses(camera_id, status_codes(np.asarray(occupied, dtype=bool), booked))
+
+    def set_statuses(self, camera_id: str, codes: np.ndarray) -> bool:
+        """Write one camera's status codes, publishing an event per change; returns True if any changed."""
+        changed, previous = self.spaces.set_status(codes, self.camera_slices[camera_id].start)
+        self.events.publish_all([
+            status_change(self.spaces.ids[i], STATUS_NAMES[old], STATUS_NAMES[self.spaces.status[i]])
+            for i, old in zip(changed.tolist(), previous.tolist())
+        ])
+        return len(changed) > 0
 
     def update_booking_spaces(self):
         """Update available spaces in booking tab."""
-        available_spaces = [space.id for space in self.spaces if space.status == "free"]
-        self.booking_tab.update_available_spaces(available_spaces)
+        self.booking_tab.update_available_spaces(self.spaces.ids_with_status(FREE))
 
     def update_bookings(self):
         """Update booking displays."""
@@ -227,43 +400,93 @@ class ParkingSystem:
         self.booking_tab.update_bookings()
         self.root.after(30000, self.update_bookings)  # Update every 30 seconds
 
+    def flush_occupancy_history(self):
+        """Write buffered status transitions to the occupancy history."""
+        if not self.root.winfo_exists():
+            return
+        
+        self.occupancy_history.flush()
+        self.root.after(int(self.HISTORY_FLUSH_INTERVAL * 1000), self.flush_occupancy_history)
+
     def update_video(self):
-        """Update video display."""
+        """Show the latest frame and statuses produced by the detection pipeline."""
         if not self.root.winfo_exists():
             return
 
-        success, frame = self.video_processor.read_frame()
-        if success:
-            processed_frame = self.video_processor.process_frame(frame)
-            
-            # Update space statuses
-            for space in self.spaces:
-                # Check physical occupancy
-                is_occupied = self.video_processor.check_space_occupancy(
-                    space.position, space.size, processed_frame
-                )
-                # Check booking status
-                is_booked = self.db_manager.is_space_booked(space.id, datetime.now())
-                
-                # Set status
-                if is_occupied:
-                    space.status = "occupied"
-                elif is_booked:
-                    space.status = "booked"
-                else:
-                    space.status = "free"
-            
-            # Draw spaces and update display
-            frame_with_spaces = self.video_processor.draw_spaces(frame, self.spaces)
-            display_image = self.video_processor.get_display_image(frame_with_spaces)
-            
-            self.monitor_tab.update_video_display(display_image)
-            self.monitor_tab.update_status(self.spaces)
+        started = time.monotonic()
+        metrics = self.metrics
+        with metrics.timer('update_video.expired_bookings'):
+            changed = self.handle_expired_bookings()
+
+        result = self.pipeline.latest_result()
+        if result is not None:
+            # Statuses from a superseded layout no longer line up with the spaces
+            if result.layout is self.pipeline.layout:
+                with metrics.timer('update_video.set_statuses'):
+                    # Bookings are resolved here, not from the worker's render-time view of them
+                    changed |= self.apply_occupancy(self.cameras.primary.camera_id, result.occupied)
             
+            if result.image is not None:
+                with self.pipeline.scheduler.timed('present'):
+                    self.monitor_tab.update_video_display(result.image)
+        
+        area = self.monitor_tab.display_area()
+        if area is not None:
+            self.pipeline.set_display_box(*area)
+        
+        with metrics.timer('update_video.remote_cameras'):
+            remote = self.detection_backend.poll()
+            for camera_id, camera_status in remote.items():
+                # Results computed against a layout we have not loaded yet are skipped
+                changed |= self.apply_occupancy(camera_id, camera_status.occupied)
+        
+        # Subscribers already applied the changes; redraw once per tick, and the rates slowly
+        if changed or started - self.status_refreshed >= self.RATES_REFRESH_INTERVAL:
+            with metrics.timer('update_video.show_status'):
+                self.monitor_tab.show_status(self.pipeline.scheduler.rates())
+            self.status_refreshed = started
+        if changed:
             # Update booking spaces
-            self.update_booking_spaces()
+            with metrics.timer('update_video.available_spaces'):
+                self.booking_tab.flush_available_spaces()
         
-        self.root.after(100, self.update_video)  # Update every 100ms
+        # Poll again when the next displayed frame is due, less the time this tick took
+        elapsed = time.monotonic() - started
+        metrics.observe('update_video', elapsed * 1000.0)
+        delay = self.pipeline.scheduler.poll_delay(elapsed)
+        self.root.after(int(delay * 1000), self.update_video)
+
+    def count_event(self, event: Event):
+        self.metrics.increment(f"events.{type(event).__name__}")
+
+    def refresh_metrics(self):
+        """Show the latest stage timings in the Admin tab and write the metrics file."""
+        if not self.root.winfo_exists():
+            return
+        
+        self.admin_tab.update_performance(self.metrics.stage_stats())
+        if self.cameras.metrics_file is not None:
+            try:
+                prometheus.write_file(self.metrics, self.cameras.metrics_file)
+            except OSError as e:
+                print(f"Error writing metrics file: {e}")
+        self.root.after(int(self.METRICS_REFRESH_INTERVAL * 1000), self.refresh_metrics)
+
+    def handle_expired_bookings(self) -> bool:
+        """Publish expiries from the expiry scheduler and refresh the booking views.
+
+        Returns True if freeing the expired bookings changed any space's status.
+        """
+        expired = []
+        while not self.expired_bookings.empty():
+            expired.extend(self.expired_bookings.get_nowait())
+        if not expired:
+            return False
+        spaces = self.db_manager.get_booking_spaces(expired)
+        self.events.publish_all([BookingExpired(booking_id, spaces.get(booking_id))
+                                 for booking_id in expired])
+        self.booking_tab.update_bookings()
+        return self.reapply_bookings()
 
     def refresh_bookings(self):
         """Manually refresh the booking displays."""
@@ -272,7 +495,13 @@ class ParkingSystem:
 
     def on_closing(self):
         """Clean up resources before closing."""
+        self.pipeline.stop()
+        self.detection_backend.stop()
+        if self.event_publisher is not None:
+            self.event_publisher.stop()
         self.video_processor.release()
+        self.occupancy_history.flush()
+        self.db_manager.close()
         self.root.destroy()
 
 if __name__ == "__main__":
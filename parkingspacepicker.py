@@ -1,22 +1,13 @@
 import cv2
-import pickle
 import numpy as np
-from dataclasses import dataclass
-from typing import Tuple, List, Optional
-
-@dataclass
-class ParkingSpace:
-    id: str
-    position: Tuple[int, int]
-    width: int
-    height: int
-    is_occupied: bool = False
-    is_booked: bool = False
+from typing import Tuple, Optional
+from models.layout_store import LayoutStore, LayoutError, empty_rects
+from models.parking_space import SpaceTable
 
 class ParkingSpacePicker:
     def __init__(self, image_path: str):
         self.image_path = image_path
-        self.spaces: List[ParkingSpace] = []
+        self.spaces = SpaceTable()
         self.drawing = False
         self.dragging = False
         self.resizing = False
@@ -32,26 +23,19 @@ class ParkingSpacePicker:
         self.sidebar_color = (240, 240, 240)  # Light gray
         
         # Load existing spaces
+        self.layout_store = LayoutStore()
         try:
-            with open('CarParkPos', 'rb') as f:
-                saved_data = pickle.load(f)
-                for i, (pos, size) in enumerate(saved_data):
-                    self.spaces.append(ParkingSpace(
-                        id=f"P{i+1:03d}",
-                        position=pos,
-                        width=size[0],
-                        height=size[1]
-                    ))
-                if self.spaces:
-                    self.template_size = (self.spaces[0].width, self.spaces[0].height)
-        except:
-            pass
+            rects = self.layout_store.load()
+        except (OSError, LayoutError) as e:
+            print(f"Error loading parking spaces: {e}")
+            rects = empty_rects()
+        self.spaces = SpaceTable([f"P{i+1:03d}" for i in range(len(rects))], rects)
+        if len(self.spaces):
+            self.template_size = (self.spaces[0].width, self.spaces[0].height)
 
     def save_spaces(self):
         """Save parking spaces to file"""
-        save_data = [(space.position, (space.width, space.height)) for space in self.spaces]
-        with open('CarParkPos', 'wb') as f:
-            pickle.dump(save_data, f)
+        self.layout_store.save(self.spaces.rects)
 
     def is_near_point(self, p1: Tuple[int, int], p2: Tuple[int, int], threshold: int = 10) -> bool:
         """Check if two points are near each other"""
@@ -62,20 +46,17 @@ class ParkingSpacePicker:
         x, y = point
         if x > self.img_width:  # Ignore clicks in sidebar
             return None, False
-            
-        for i, space in enumerate(self.spaces):
-            # Check if point is in resize handle
-            handle_x = space.position[0] + space.width
-            handle_y = space.position[1] + space.height
-            if self.is_near_point((x, y), (handle_x, handle_y), self.resize_handle_size):
-                return i, True
-            
-            # Check if point is inside rectangle
-            if (space.position[0] <= x <= space.position[0] + space.width and 
-                space.position[1] <= y <= space.position[1] + space.height):
-                return i, False
         
-        return None, False
+        positions, sizes = self.spaces.positions, self.spaces.sizes
+        corners = positions + sizes
+        # Resize handle or inside the rectangle; the first space in list order wins
+        near_handle = (np.abs(corners - (x, y)) < self.resize_handle_size).all(axis=1)
+        inside = ((positions <= (x, y)) & ((x, y) <= corners)).all(axis=1)
+        hits = np.flatnonzero(near_handle | inside)
+        if len(hits) == 0:
+            return None, False
+        i = int(hits[0])
+        return i, bool(near_handle[i])
 
     def handle_mouse_event(self, event, x, y, flags, param):
         if x > self.img_width:  # Ignore events in sidebar
@@ -97,13 +78,7 @@ class ParkingSpacePicker:
                     self.end_point = (x, y)
                 else:  # Use template size for subsequent spaces
                     width, height = self.template_size
-                    new_space = ParkingSpace(
-                        id=f"P{len(self.spaces)+1:03d}",
-                        position=(x, y),
-                        width=width,
-                        height=height
-                    )
-                    self.spaces.append(new_space)
+                    self.spaces.append(f"P{len(self.spaces)+1:03d}", (x, y, width, height))
                     self.save_spaces()
 
         elif event == cv2.EVENT_MOUSEMOVE:
@@ -132,13 +107,7 @@ class ParkingSpacePicker:
                 width = x2 - x1
                 height = y2 - y1
                 if width > 30 and height > 20:  # Minimum size check
-                    new_space = ParkingSpace(
-                        id=f"P{len(self.spaces)+1:03d}",
-                        position=(x1, y1),
-                        width=width,
-                        height=height
-                    )
-                    self.spaces.append(new_space)
+                    self.spaces.append(f"P{len(self.spaces)+1:03d}", (x1, y1, width, height))
                     self.template_size = (width, height)  # Set as template
                 self.start_point = (-1, -1)
                 self.end_point = (-1, -1)
@@ -248,7 +217,7 @@ class ParkingSpacePicker:
             if key == ord('q'):
                 break
             elif key == ord('r'):
-                self.spaces = []
+                self.spaces = SpaceTable()
                 self.template_size = None
                 self.save_spaces()
             elif key == ord('s'):
@@ -1,9 +1,18 @@
 import tkinter as tk
 from tkinter import ttk
-from typing import List, Callable
+from typing import Callable, List
 from parkingspacepicker import ParkingSpacePicker
-from models.parking_space import ParkingSpace
+from models.parking_space import SpaceTable
 from database.db_manager import DatabaseManager
+from events.event_types import BookingCreated, SpaceStatusChanged
+from metrics.registry import StageStats
+from tabs.tree_sync import TreeSync
+
+STATUS_DISPLAY = {
+    "free": "Available",
+    "booked": "Booked",
+    "occupied": "Occupied"
+}
 
 class AdminTab:
     def __init__(self, parent: ttk.Frame, db_manager: DatabaseManager):
@@ -35,6 +44,22 @@ class AdminTab:
             self.space_tree.column(col, width=100)
         
         self.space_tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.space_sync = TreeSync(self.space_tree)
+        
+        # Performance panel
+        self.performance_frame = ttk.LabelFrame(self.parent, text="Performance (last minute)")
+        self.performance_frame.pack(padx=20, pady=(0, 20), fill=tk.X)
+        
+        columns = ('Stage', 'Calls', 'Rate', 'p50', 'p95', 'p99', 'Max')
+        self.performance_tree = ttk.Treeview(self.performance_frame, columns=columns,
+                                             show='headings', height=10)
+        headings = ['Stage', 'Calls', 'Per Second', 'p50 (ms)', 'p95 (ms)', 'p99 (ms)', 'Max (ms)']
+        for col, heading in zip(columns, headings):
+            self.performance_tree.heading(col, text=heading)
+            self.performance_tree.column(col, width=240 if col == 'Stage' else 80)
+        
+        self.performance_tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.performance_sync = TreeSync(self.performance_tree)
 
     def set_picker_command(self, command: Callable):
         """Set the command for the space picker button."""
@@ -44,22 +69,42 @@ class AdminTab:
         """Set the command for the refresh button."""
         self.refresh_button.configure(command=command)
 
-    def update_space_list(self, spaces: List[ParkingSpace]):
-        """Update the space list with current data."""
-        # Clear current items
-        for item in self.space_tree.get_children():
-            self.space_tree.delete(item)
-        
-        # Add spaces to tree
-        for space in spaces:
+    def update_space_list(self, spaces: SpaceTable):
+        """Update the space list with current data, changing only rows that differ."""
+        booking_counts = self.db_manager.get_booking_counts()
+        rows = []
+        for space_id, status in zip(spaces.ids, spaces.status_names()):
             # Get booking count
-            booking_count = self.db_manager.get_booking_count(space.id)
+            booking_count = booking_counts.get(space_id, 0)
             
             # Get status display text
-            status_display = {
-                "free": "Available",
-                "booked": "Booked",
-                "occupied": "Occupied"
-            }.get(space.status, "Available")
+            status_display = STATUS_DISPLAY.get(status, "Available")
             
-            self.space_tree.insert('', 'end', values=(space.id, status_display, booking_count)) 
\ No newline at end of file
+            rows.append((space_id, (space_id, status_display, booking_count)))
+        self.space_sync.apply(rows)
+
+    def set_performance_enabled(self, enabled: bool):
+        """Say in the panel title when instrumentation is switched off."""
+        text = "Performance (last minute)" if enabled else "Performance (set \"metrics\" in cameras.json)"
+        self.performance_frame.configure(text=text)
+
+    def update_performance(self, stages: List[StageStats]):
+        """Show the latest per-stage latency statistics."""
+        self.performance_sync.apply(
+            (stage.name, (stage.name, stage.count, f"{stage.rate:.1f}", f"{stage.p50_ms:.2f}",
+                          f"{stage.p95_ms:.2f}", f"{stage.p99_ms:.2f}", f"{stage.max_ms:.2f}"))
+            for stage in stages
+        )
+
+    def on_status_changed(self, event: SpaceStatusChanged):
+        """Update the one row whose status changed."""
+        row = self.space_sync.rows.get(event.space_id)
+        if row is not None:
+            self.space_sync.update(event.space_id,
+                                   (row[0], STATUS_DISPLAY.get(event.new_status, "Available"), row[2]))
+
+    def on_booking_created(self, event: BookingCreated):
+        """Bump the booked space's total booking count."""
+        row = self.space_sync.rows.get(event.space_id)
+        if row is not None:
+            self.space_sync.update(event.space_id, (row[0], row[1], int(row[2]) + 1))
@@ -1,13 +1,24 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from typing import List, Dict, Callable
+from typing import List, Dict, Callable, Optional
 from datetime import datetime, timedelta
 from database.db_manager import DatabaseManager
+from events.event_types import SpaceStatusChanged
+from metrics.registry import MetricsRegistry
+from tabs.tree_sync import TreeSync
 
 class BookingTab:
-    def __init__(self, parent: ttk.Frame, db_manager: DatabaseManager):
+    EXPIRED_PAGE_SIZE = 100  # Expired bookings fetched per scroll page
+
+    def __init__(self, parent: ttk.Frame, db_manager: DatabaseManager,
+                 metrics: Optional[MetricsRegistry] = None):
         self.parent = parent
         self.db_manager = db_manager
+        self.metrics = metrics if metrics is not None else MetricsRegistry()
+        self.expired_cursor = None  # (end_time, id) of the oldest expired booking loaded
+        self.expired_exhausted = False
+        self.available_spaces = set()
+        self.available_dirty = False
         self.setup_ui()
 
     def setup_ui(self):
@@ -53,6 +64,10 @@ class BookingTab:
         # Book button
         self.book_button = ttk.Button(form_frame, text="Book Space")
         self.book_button.grid(row=5, column=0, columnspan=2, pady=20)
+
+        # Bulk import button
+        self.import_button = ttk.Button(form_frame, text="Import Bookings...")
+        self.import_button.grid(row=6, column=0, columnspan=2)
         
         # Create notebook for active and expired bookings
         bookings_notebook = ttk.Notebook(self.parent)
@@ -94,6 +109,7 @@ class BookingTab:
             self.booking_tree.column(col, width=width)
         
         self.booking_tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.booking_sync = TreeSync(self.booking_tree)
         
         # Expired bookings frame
         expired_frame = ttk.Frame(bookings_notebook)
@@ -125,10 +141,37 @@ class BookingTab:
             self.expired_tree.heading(col, text=col)
             self.expired_tree.column(col, width=width)
         
+        # Load older pages as the user scrolls towards the end of the list
+        self.expired_scrollbar = ttk.Scrollbar(expired_frame, orient=tk.VERTICAL,
+                                               command=self.expired_tree.yview)
+        self.expired_tree.configure(yscrollcommand=self.on_expired_scroll)
+        self.expired_scrollbar.pack(side=tk.RIGHT, fill=tk.Y, pady=5)
+        
         self.expired_tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.expired_sync = TreeSync(self.expired_tree)
 
     def update_available_spaces(self, space_ids: List[str]):
         """Update the available spaces in the combobox."""
+        self.available_spaces = set(space_ids)
+        self.available_dirty = True
+        self.flush_available_spaces()
+
+    def on_status_changed(self, event: SpaceStatusChanged):
+        """Track one space entering or leaving the free set; shown on the next flush."""
+        if event.new_status == "free":
+            self.available_spaces.add(event.space_id)
+        elif event.old_status == "free":
+            self.available_spaces.discard(event.space_id)
+        else:
+            return
+        self.available_dirty = True
+
+    def flush_available_spaces(self):
+        """Push the free set into the combobox if it changed since the last flush."""
+        if not self.available_dirty:
+            return
+        self.available_dirty = False
+        space_ids = sorted(self.available_spaces)
         self.space_combo['values'] = space_ids
         if not self.space_var.get() and space_ids:
             self.space_var.set(space_ids[0])
@@ -145,6 +188,10 @@ class BookingTab:
         """Set the command for the book button."""
         self.book_button.configure(command=command)
 
+    def set_import_command(self, command: Callable):
+        """Set the command for the import button."""
+        self.import_button.configure(command=command)
+
     def set_cancel_command(self, command: Callable):
         """Set the command for the cancel button."""
         self.cancel_button.configure(command=command)
@@ -161,75 +208,88 @@ class BookingTab:
         }
 
     def update_bookings(self):
-        """Update the booking trees with current data."""
-        # Clear current items
-        for tree in [self.booking_tree, self.expired_tree]:
-            for item in tree.get_children():
-                tree.delete(item)
-
-        # Get bookings from database
-        active_bookings = self.db_manager.get_active_bookings()
-        expired_bookings = self.db_manager.get_expired_bookings()
-        current_time = datetime.now()
-
-        # Update active bookings
-        for booking in active_bookings:
-            try:
-                # Parse end time, handling potential microseconds
-                end_time_str = booking['end_time'].split('.')[0]
-                end_time = datetime.strptime(end_time_str, '%Y-%m-%d %H:%M:%S')
-                start_time = datetime.strptime(booking['start_time'].split('.')[0], '%Y-%m-%d %H:%M:%S')
-                
-                time_left = end_time - current_time
-                
-                # If booking has expired, move it to expired bookings
-                if time_left.total_seconds() <= 0:
-                    self.db_manager.cancel_booking(booking['id'])
-                    self.expired_tree.insert('', 'end', values=(
-                        booking['id'],
-                        booking['space_id'],
-                        booking['user_name'],
-                        booking['license_plate'],
-                        start_time.strftime('%Y-%m-%d %H:%M'),
-                        end_time.strftime('%Y-%m-%d %H:%M')
-                    ))
-                else:
-                    # Calculate time left
-                    hours = time_left.seconds // 3600
-                    minutes = (time_left.seconds % 3600) // 60
-                    time_left_str = f"{hours}h {minutes}m"
-                    
-                    self.booking_tree.insert('', 'end', values=(
-                        booking['id'],
-                        booking['space_id'],
-                        booking['user_name'],
-                        booking['license_plate'],
-                        start_time.strftime('%Y-%m-%d %H:%M'),
-                        end_time.strftime('%Y-%m-%d %H:%M'),
-                        'Active',
-                        time_left_str
-                    ))
-            except (ValueError, IndexError) as e:
-                print(f"Error processing booking {booking['id']}: {e}")
-                continue
-
-        # Update expired bookings
-        for booking in expired_bookings:
-            try:
-                start_time = datetime.strptime(booking['start_time'].split('.')[0], '%Y-%m-%d %H:%M:%S')
-                end_time = datetime.strptime(booking['end_time'].split('.')[0], '%Y-%m-%d %H:%M:%S')
-                
-                self.expired_tree.insert('', 'end', values=(
+        """Update the booking trees with current data, changing only rows that differ."""
+        with self.metrics.timer('booking_tab.update_bookings'):
+            active_bookings = self.db_manager.get_active_bookings()
+            current_time = datetime.now()
+
+            # Update active bookings; the expiry scheduler deactivates them when they end
+            active_rows = []
+            for booking in active_bookings:
+                start_time = booking['start_time']
+                end_time = booking['end_time']
+                time_left = max(end_time - current_time, timedelta(0))
+            
+                # Calculate time left
+                hours = time_left.seconds // 3600
+                minutes = (time_left.seconds % 3600) // 60
+                time_left_str = f"{hours}h {minutes}m"
+            
+                active_rows.append((booking['id'], (
                     booking['id'],
                     booking['space_id'],
                     booking['user_name'],
                     booking['license_plate'],
                     start_time.strftime('%Y-%m-%d %H:%M'),
-                    end_time.strftime('%Y-%m-%d %H:%M')
-                ))
-            except (ValueError, IndexError) as e:
-                print(f"Error processing expired booking {booking['id']}: {e}")
-                continue
+                    end_time.strftime('%Y-%m-%d %H:%M'),
+                    'Active',
+                    time_left_str
+                )))
+            self.booking_sync.apply(active_rows)
+
+            # Merge newly expired bookings into the top of the already loaded pages
+            if self.expired_cursor is None:
+                self.append_expired_page(self.db_manager.get_expired_bookings(limit=self.EXPIRED_PAGE_SIZE))
+            else:
+                self.expired_sync.merge(self.expired_row(booking) for booking in self.newest_expired())
+
+    def newest_expired(self) -> List[Dict]:
+        """Expired bookings from the newest down to the first page holding an already shown row.
+
+        Paging on until a known row is reached means a burst of more than a page
+        of expiries between refreshes cannot leave a gap above the loaded rows.
+        """
+        bookings: List[Dict] = []
+        before = None
+        while True:
+            page = self.db_manager.get_expired_bookings(limit=self.EXPIRED_PAGE_SIZE, before=before)
+            bookings.extend(page)
+            if len(page) < self.EXPIRED_PAGE_SIZE or any(booking['id'] in self.expired_sync
+                                                         for booking in page):
+                return bookings
+            before = (page[-1]['end_time'], page[-1]['id'])
+
+    def load_more_expired(self):
+        """Load the next page of older expired bookings."""
+        if self.expired_exhausted or self.expired_cursor is None:
+            return
+        self.append_expired_page(self.db_manager.get_expired_bookings(
+            limit=self.EXPIRED_PAGE_SIZE, before=self.expired_cursor))
+
+    def append_expired_page(self, bookings: List[Dict]):
+        """Append a page of expired bookings and advance the paging cursor."""
+        self.expired_sync.append(self.expired_row(booking) for booking in bookings)
+        if bookings:
+            self.expired_cursor = (bookings[-1]['end_time'], bookings[-1]['id'])
+        self.expired_exhausted = len(bookings) < self.EXPIRED_PAGE_SIZE
+
+    def on_expired_scroll(self, first: str, last: str):
+        """Track the expired tree's scroll position and fetch more rows near the end."""
+        self.expired_scrollbar.set(first, last)
+        if float(last) >= 0.9:
+            self.load_more_expired()
+
+    @staticmethod
+    def expired_row(booking: Dict):
+        """Build the (key, values) pair shown in the expired bookings tree."""
+        return booking['id'], (
+            booking['id'],
+            booking['space_id'],
+            booking['user_name'],
+            booking['license_plate'],
+            booking['start_time'].strftime('%Y-%m-%d %H:%M'),
+            booking['end_time'].strftime('%Y-%m-%d %H:%M')
+        )
 
     def set_refresh_commands(self, command: Callable):
         """Set the command for both refresh buttons."""
@@ -1,11 +1,17 @@
 import tkinter as tk
+from collections import Counter
 from tkinter import ttk
-from typing import List, Callable
-from models.parking_space import ParkingSpace
+from typing import Dict, Callable, Optional, Tuple
+from PIL import Image, ImageTk
+from models.parking_space import SpaceTable
+from events.event_types import SpaceStatusChanged
 
 class MonitorTab:
     def __init__(self, parent: ttk.Frame):
         self.parent = parent
+        self.photo: Optional[ImageTk.PhotoImage] = None
+        self.status_counts = Counter()
+        self.space_count = 0
         self.setup_ui()
 
     def setup_ui(self):
@@ -32,22 +38,47 @@ class MonitorTab:
         self.status_text = tk.Text(status_frame, height=5, width=50)
         self.status_text.pack(padx=5, pady=5)
 
-    def update_status(self, spaces: List[ParkingSpace]):
-        """Update the status text with current parking space statistics."""
-        free_count = sum(1 for space in spaces if space.status == "free")
-        booked_count = sum(1 for space in spaces if space.status == "booked")
-        occupied_count = sum(1 for space in spaces if space.status == "occupied")
-        
+    def update_status(self, spaces: SpaceTable, rates: Optional[Dict[str, float]] = None):
+        """Recount statuses from the full space table and update the status text."""
+        self.status_counts = Counter(spaces.counts())
+        self.space_count = len(spaces)
+        self.show_status(rates)
+
+    def on_status_changed(self, event: SpaceStatusChanged):
+        """Move one space between the status counts; the text updates on the next show_status."""
+        self.status_counts[event.old_status] -= 1
+        self.status_counts[event.new_status] += 1
+
+    def show_status(self, rates: Optional[Dict[str, float]] = None):
+        """Update the status text with the current counts and achieved frame rates."""
+        total = self.space_count
         self.status_text.delete(1.0, tk.END)
-        self.status_text.insert(tk.END, f"Free Spaces: {free_count}/{len(spaces)}\n")
-        self.status_text.insert(tk.END, f"Booked Spaces: {booked_count}/{len(spaces)}\n")
-        self.status_text.insert(tk.END, f"Occupied Spaces: {occupied_count}/{len(spaces)}\n")
+        self.status_text.insert(tk.END, f"Free Spaces: {self.status_counts['free']}/{total}\n")
+        self.status_text.insert(tk.END, f"Booked Spaces: {self.status_counts['booked']}/{total}\n")
+        self.status_text.insert(tk.END, f"Occupied Spaces: {self.status_counts['occupied']}/{total}\n")
+        if rates is not None:
+            self.status_text.insert(tk.END, f"Detection: {rates['detect']:.1f} fps, "
+                                            f"Display: {rates['display']:.1f} fps\n")
 
     def set_pause_command(self, command: Callable):
         """Set the command for the pause button."""
         self.pause_button.configure(command=command)
 
-    def update_video_display(self, image):
-        """Update the video display with a new image."""
-        self.video_label.configure(image=image)
-        self.video_label.image = image  # Keep a reference to prevent garbage collection 
\ No newline at end of file
+    def display_area(self) -> Optional[Tuple[int, int]]:
+        """Space available to the video image, or None before the label is laid out."""
+        width, height = self.video_label.winfo_width(), self.video_label.winfo_height()
+        if width <= 1 or height <= 1:
+            return None
+        # The label requests the current image plus its own chrome; only the rest is free
+        image_width, image_height = (self.photo.width(), self.photo.height()) if self.photo else (0, 0)
+        chrome_width = self.video_label.winfo_reqwidth() - image_width
+        chrome_height = self.video_label.winfo_reqheight() - image_height
+        return max(width - chrome_width, 1), max(height - chrome_height, 1)
+
+    def update_video_display(self, image: Image.Image):
+        """Show a new frame, pasting into the existing PhotoImage when the size is unchanged."""
+        if self.photo is not None and (self.photo.width(), self.photo.height()) == image.size:
+            self.photo.paste(image)
+            return
+        self.photo = ImageTk.PhotoImage(image=image)
+        self.video_label.configure(image=self.photo)
@@ -0,0 +1,69 @@
+from tkinter import ttk
+from typing import Dict, Hashable, Iterable, Tuple
+
+
+class TreeSync:
+    """Keeps a Treeview in step with keyed rows by applying only the differences.
+
+    Rows are stored under their key as the item iid, so refreshes insert new
+    rows, update changed ones in place and delete stale ones instead of
+    rebuilding the whole tree.
+    """
+
+    def __init__(self, tree: ttk.Treeview):
+        self.tree = tree
+        self.rows: Dict[str, Tuple] = {}
+
+    def __contains__(self, key: Hashable) -> bool:
+        return str(key) in self.rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def apply(self, rows: Iterable[Tuple[Hashable, Tuple]]):
+        """Make the tree show exactly ``rows``, given as ordered (key, values) pairs.
+
+        Existing rows keep their place; new rows are inserted at their index in ``rows``.
+        """
+        new_rows = {str(key): tuple(values) for key, values in rows}
+
+        stale = [iid for iid in self.rows if iid not in new_rows]
+        if stale:
+            self.tree.delete(*stale)
+            for iid in stale:
+                del self.rows[iid]
+
+        for index, (iid, values) in enumerate(new_rows.items()):
+            old_values = self.rows.get(iid)
+            if old_values is None:
+                self.tree.insert('', index, iid=iid, values=values)
+            elif old_values != values:
+                self.tree.item(iid, values=values)
+        self.rows = new_rows
+
+    def update(self, key: Hashable, values: Tuple):
+        """Change one row's values in place; does nothing if the row is not shown."""
+        iid, values = str(key), tuple(values)
+        old_values = self.rows.get(iid)
+        if old_values is not None and old_values != values:
+            self.tree.item(iid, values=values)
+            self.rows[iid] = values
+
+    def merge(self, rows: Iterable[Tuple[Hashable, Tuple]]):
+        """Insert or update rows from an ordered prefix of the full list, keeping the rest."""
+        for index, (key, values) in enumerate(rows):
+            iid, values = str(key), tuple(values)
+            old_values = self.rows.get(iid)
+            if old_values is None:
+                self.tree.insert('', index, iid=iid, values=values)
+            elif old_values != values:
+                self.tree.item(iid, values=values)
+            self.rows[iid] = values
+
+    def append(self, rows: Iterable[Tuple[Hashable, Tuple]]):
+        """Add rows at the end of the tree, skipping any already shown."""
+        for key, values in rows:
+            iid = str(key)
+            if iid not in self.rows:
+                self.rows[iid] = tuple(values)
+                self.tree.insert('', 'end', iid=iid, values=self.rows[iid])
@@ -0,0 +1,125 @@
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List
+import cv2
+import numpy as np
+from models.layout_store import LayoutStore
+from video.cameras import CameraConfig
+from video.occupancy import OccupancyTracker
+from video.video_processor import VideoProcessor
+
+
+@dataclass
+class Timeline:
+    """Occupancy of every space over one recorded video, stored as flips only.
+
+    Each space starts in ``initial[i]`` and toggles at every frame listed for
+    it in ``change_frames``/``change_spaces``, so a week of footage reduces to
+    a few numbers per car that came or went.
+    """
+    video_path: str
+    fps: float
+    frame_count: int
+    stride: int
+    space_ids: List[str]
+    initial: np.ndarray  # bool per space, as of the first analysed frame
+    change_frames: np.ndarray  # frame index of each flip, ascending
+    change_spaces: np.ndarray  # space index of each flip
+    seconds: float = 0.0  # Wall time the analysis took
+
+    def changes(self, i: int) -> np.ndarray:
+        """Frame indices at which space ``i`` flipped."""
+        return self.change_frames[self.change_spaces == i]
+
+    def occupied_frames(self) -> np.ndarray:
+        """Number of frames each space spent occupied."""
+        totals = np.zeros(len(self.space_ids), dtype=np.int64)
+        for i in range(len(self.space_ids)):
+            edges = np.concatenate(([0], self.changes(i), [self.frame_count]))
+            spans = np.diff(edges)
+            totals[i] = spans[0 if self.initial[i] else 1::2].sum()
+        return totals
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-ready form: per space its initial state and the frames where it flipped."""
+        return {
+            'video': self.video_path,
+            'fps': self.fps,
+            'frames': self.frame_count,
+            'stride': self.stride,
+            'spaces': {
+                space_id: {'occupied': bool(self.initial[i]), 'changes': self.changes(i).tolist()}
+                for i, space_id in enumerate(self.space_ids)
+            },
+        }
+
+
+def load_layout(camera: CameraConfig) -> np.ndarray:
+    """Load a camera's layout for analysis, importing a legacy layout if needed.
+
+    Call this once before fanning out over videos, so parallel workers never
+    race to write the imported layout file.
+    """
+    rects = LayoutStore(camera.layout_path, camera.legacy_layout_path).load()
+    if len(rects) == 0:
+        raise ValueError(f"Layout '{camera.layout_path}' has no parking spaces")
+    return rects
+
+
+def analyze_video(video_path: str, camera: CameraConfig, rects: np.ndarray, stride: int = 1,
+                  enter_threshold: int = VideoProcessor.OCCUPANCY_THRESHOLD,
+                  exit_threshold: int = VideoProcessor.VACANCY_THRESHOLD,
+                  debounce: int = VideoProcessor.DEBOUNCE_FRAMES) -> Timeline:
+    """Run detection over every ``stride``-th frame of a video, once, as fast as it decodes.
+
+    ``rects`` is the camera's layout, as returned by load_layout; the camera
+    names the spaces. Skipped frames are only grabbed, not decoded into an image. ``debounce``
+    counts analysed frames, so it spans ``debounce * stride`` video frames.
+    """
+    if stride < 1:
+        raise ValueError("Frame stride must be at least 1")
+    if len(rects) == 0:
+        raise ValueError("The layout has no parking spaces")
+    started = time.perf_counter()
+    processor = VideoProcessor(video_path)
+    processor.occupancy = OccupancyTracker(enter_threshold, exit_threshold, debounce)
+    cap = processor.cap
+    if not cap.isOpened():
+        raise ValueError(f"Could not open video '{video_path}'")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+
+    initial = np.zeros(len(rects), dtype=bool)
+    change_frames: List[np.ndarray] = []
+    change_spaces: List[np.ndarray] = []
+    frame = None
+    frame_index = 0
+    try:
+        while True:
+            if not cap.grab():
+                break
+            if frame_index % stride == 0:
+                success, frame = cap.retrieve(frame)
+                if not success:
+                    break
+                occupied = processor.detect_occupancy(frame, rects)
+                if frame_index == 0:
+                    initial = occupied.copy()
+                elif len(processor.occupancy.changed):
+                    changed = processor.occupancy.changed
+                    change_frames.append(np.full(len(changed), frame_index, dtype=np.int64))
+                    change_spaces.append(changed.astype(np.int32))
+            frame_index += 1
+    finally:
+        processor.release()
+
+    return Timeline(
+        video_path=video_path,
+        fps=fps,
+        frame_count=frame_index,
+        stride=stride,
+        space_ids=[camera.space_id(i) for i in range(len(rects))],
+        initial=initial,
+        change_frames=np.concatenate(change_frames) if change_frames else np.zeros(0, dtype=np.int64),
+        change_spaces=np.concatenate(change_spaces) if change_spaces else np.zeros(0, dtype=np.int32),
+        seconds=time.perf_counter() - started,
+    )
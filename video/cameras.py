@@ -0,0 +1,100 @@
+import json
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+
+@dataclass(frozen=True)
+class CameraConfig:
+    """One camera feed and the layout file describing its spaces."""
+    camera_id: str
+    video_path: str
+    layout_path: str
+    legacy_layout_path: Optional[str] = None
+    space_prefix: str = "P"
+
+    def space_id(self, index: int) -> str:
+        """Id of the space at ``index`` in this camera's layout."""
+        return f"{self.space_prefix}{index + 1:03d}"
+
+
+DEFAULT_CAMERA = CameraConfig('main', 'carPark.mp4', 'CarParkPos.bin', 'CarParkPos')
+
+
+class CameraRegistry:
+    """The site's cameras, read from a JSON file.
+
+    The file holds ``{"process_pipeline": bool, "detect_fps": float,
+    "display_fps": float, "event_port": int, "metrics": bool, "metrics_file": str,
+    "cameras": [{"id", "video", "layout", "legacy_layout", "space_prefix"}, ...]}``. Without it the
+    registry contains the single default camera, so a one-camera lot needs no
+    configuration. ``process_pipeline`` moves the monitored camera's decoding
+    and detection into a worker process that shares frames through shared
+    memory; the two rates are the monitored camera's detection and display
+    targets; ``event_port`` streams parking events to local clients.
+    ``metrics`` turns on stage timing for the Admin tab's performance panel,
+    and ``metrics_file`` also writes it in the Prometheus text format.
+    """
+
+    def __init__(self, cameras: List[CameraConfig], process_pipeline: bool = False,
+                 detect_fps: float = 10.0, display_fps: float = 10.0,
+                 event_port: Optional[int] = None, metrics: bool = False,
+                 metrics_file: Optional[str] = None):
+        if not cameras:
+            raise ValueError("A camera registry needs at least one camera")
+        ids = [camera.camera_id for camera in cameras]
+        if len(set(ids)) != len(ids):
+            raise ValueError("Camera ids must be unique")
+        prefixes = [camera.space_prefix for camera in cameras]
+        if len(set(prefixes)) != len(prefixes):
+            raise ValueError("Camera space prefixes must be unique")
+        self.cameras = list(cameras)
+        self.process_pipeline = process_pipeline
+        self.detect_fps = detect_fps
+        self.display_fps = display_fps
+        self.event_port = event_port
+        self.metrics = metrics or metrics_file is not None
+        self.metrics_file = metrics_file
+        self._by_id: Dict[str, CameraConfig] = {camera.camera_id: camera for camera in cameras}
+
+    @classmethod
+    def load(cls, path: str = 'cameras.json') -> 'CameraRegistry':
+        """Load the registry from ``path``, or the default camera if it does not exist."""
+        if not os.path.exists(path):
+            return cls([DEFAULT_CAMERA])
+        with open(path) as f:
+            data = json.load(f)
+        try:
+            cameras = [
+                CameraConfig(
+                    camera_id=entry['id'],
+                    video_path=entry['video'],
+                    layout_path=entry['layout'],
+                    legacy_layout_path=entry.get('legacy_layout'),
+                    space_prefix=entry.get('space_prefix', 'P'),
+                )
+                for entry in data['cameras']
+            ]
+            detect_fps = float(data.get('detect_fps', 10.0))
+            display_fps = float(data.get('display_fps', 10.0))
+            event_port = int(data['event_port']) if data.get('event_port') is not None else None
+            metrics_file = str(data['metrics_file']) if data.get('metrics_file') is not None else None
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid camera registry '{path}': {e}") from e
+        return cls(cameras, process_pipeline=bool(data.get('process_pipeline', False)),
+                   detect_fps=detect_fps, display_fps=display_fps, event_port=event_port,
+                   metrics=bool(data.get('metrics', False)), metrics_file=metrics_file)
+
+    @property
+    def primary(self) -> CameraConfig:
+        """The camera shown in the monitor tab."""
+        return self.cameras[0]
+
+    def get(self, camera_id: str) -> CameraConfig:
+        return self._by_id[camera_id]
+
+    def __iter__(self):
+        return iter(self.cameras)
+
+    def __len__(self) -> int:
+        return len(self.cameras)
@@ -0,0 +1,74 @@
+import threading
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+
+class FrameBuffers:
+    """Scratch arrays reused across frames, keyed by stage name and shape.
+
+    Each thread gets its own set, so the detection worker and the Tk thread can
+    both run OpenCV stages with ``dst=`` outputs without sharing memory. Once
+    every stage has run at a given size, later frames allocate nothing.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _buffers(self) -> Dict[Tuple, np.ndarray]:
+        buffers = getattr(self._local, 'buffers', None)
+        if buffers is None:
+            buffers = self._local.buffers = {}
+        return buffers
+
+    def get(self, name: str, shape: Tuple[int, ...], dtype=np.uint8) -> np.ndarray:
+        """Return the calling thread's buffer for ``name`` at ``shape``, allocating it once."""
+        key = (name, tuple(shape), np.dtype(dtype).str)
+        buffers = self._buffers()
+        buf = buffers.get(key)
+        if buf is None:
+            buf = buffers[key] = np.empty(shape, dtype=dtype)
+        return buf
+
+    def clear(self):
+        """Drop the calling thread's buffers, e.g. after a layout or resolution change."""
+        self._buffers().clear()
+
+
+class FramePool:
+    """Recycles decoded frame arrays handed between the decoder and the detector.
+
+    A frame is acquired before decoding into it and released by whoever consumes
+    it last. Arrays the pool did not hand out are ignored on release, so callers
+    can release every frame they were given.
+    """
+
+    def __init__(self):
+        self._free: List[np.ndarray] = []
+        self._owned: Dict[int, np.ndarray] = {}
+        self._shape: Optional[Tuple[int, ...]] = None
+        self._lock = threading.Lock()
+        self.allocations = 0
+
+    def acquire(self, shape: Tuple[int, ...], dtype=np.uint8) -> np.ndarray:
+        """Take a free frame of ``shape``, allocating one if none is free."""
+        with self._lock:
+            if shape != self._shape:
+                # Resolution changed; frames of the old size are no longer useful
+                self._free.clear()
+                self._owned.clear()
+                self._shape = shape
+            if self._free:
+                return self._free.pop()
+            frame = np.empty(shape, dtype=dtype)
+            self._owned[id(frame)] = frame
+            self.allocations += 1
+            return frame
+
+    def release(self, frame: Optional[np.ndarray]):
+        """Return a frame to the pool once nothing else reads it."""
+        if frame is None:
+            return
+        with self._lock:
+            if id(frame) in self._owned and frame.shape == self._shape:
+                if not any(frame is free for free in self._free):
+                    self._free.append(frame)
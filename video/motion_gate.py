@@ -0,0 +1,78 @@
+from typing import Optional
+import cv2
+import numpy as np
+from video.frame_buffers import FrameBuffers
+
+
+class MotionGate:
+    """Flags which spaces changed since they were last processed.
+
+    Works on a downscaled grayscale copy of each frame. Each space is compared
+    with the reference pixels captured the last time that space was accepted,
+    so slow drift still builds up to a change instead of being absorbed tick by
+    tick. ``margin`` inflates every space by the filter chain's reach, since
+    motion just outside a space can alter the thresholded pixels inside it.
+    """
+
+    def __init__(self, scale: int = 4, pixel_threshold: int = 16,
+                 min_changed_pixels: int = 4, margin: int = 0,
+                 buffers: Optional[FrameBuffers] = None):
+        self.scale = scale
+        self.pixel_threshold = pixel_threshold
+        self.min_changed_pixels = min_changed_pixels
+        self.margin = margin
+        self.buffers = buffers if buffers is not None else FrameBuffers()
+        self.reference: Optional[np.ndarray] = None
+        self.rects: Optional[np.ndarray] = None
+        self.scaled_rects: Optional[np.ndarray] = None
+
+    def reset(self):
+        """Forget the reference so the next frame reports every space as changed."""
+        self.reference = None
+        self.rects = None
+
+    def downscale(self, frame: np.ndarray) -> np.ndarray:
+        """Grayscale and shrink a BGR frame by the gate's scale factor."""
+        height, width = frame.shape[:2]
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self.buffers.get('gate_gray', (height, width)))
+        small_size = (max(width // self.scale, 1), max(height // self.scale, 1))
+        return cv2.resize(gray, small_size, dst=self.buffers.get('gate_small', small_size[::-1]),
+                          interpolation=cv2.INTER_AREA)
+
+    def _scale_rects(self, rects: np.ndarray, shape) -> np.ndarray:
+        height, width = shape
+        x0 = (rects[:, 0] - self.margin) // self.scale
+        y0 = (rects[:, 1] - self.margin) // self.scale
+        x1 = -(-(rects[:, 0] + rects[:, 2] + self.margin) // self.scale)
+        y1 = -(-(rects[:, 1] + rects[:, 3] + self.margin) // self.scale)
+        return np.stack([np.clip(x0, 0, width), np.clip(y0, 0, height),
+                         np.clip(x1, 0, width), np.clip(y1, 0, height)], axis=1)
+
+    def changed_spaces(self, frame: np.ndarray, rects: np.ndarray) -> np.ndarray:
+        """Return a boolean array marking the spaces that changed in ``frame``.
+
+        Changed spaces have their reference refreshed, so they only report again
+        after further change.
+        """
+        small = self.downscale(frame)
+        if (self.reference is None or self.reference.shape != small.shape
+                or self.rects is not rects):
+            self.reference = small.copy()
+            self.rects = rects
+            self.scaled_rects = self._scale_rects(rects, small.shape)
+            return np.ones(len(rects), dtype=bool)
+
+        buffers = self.buffers
+        height, width = small.shape
+        diff = cv2.absdiff(small, self.reference, dst=buffers.get('gate_diff', small.shape))
+        moved = cv2.threshold(diff, self.pixel_threshold, 1, cv2.THRESH_BINARY,
+                              dst=buffers.get('gate_moved', small.shape))[1]
+        integral = cv2.integral(moved, sum=buffers.get('gate_integral', (height + 1, width + 1), np.int32),
+                                sdepth=cv2.CV_32S)
+        x0, y0, x1, y1 = self.scaled_rects.T
+        counts = integral[y1, x1] - integral[y0, x1] - integral[y1, x0] + integral[y0, x0]
+        changed = counts >= self.min_changed_pixels
+
+        for sx0, sy0, sx1, sy1 in self.scaled_rects[changed].tolist():
+            self.reference[sy0:sy1, sx0:sx1] = small[sy0:sy1, sx0:sx1]
+        return changed
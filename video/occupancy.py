@@ -0,0 +1,51 @@
+from typing import Optional
+import numpy as np
+
+
+class OccupancyTracker:
+    """Per-space occupancy state machine with hysteresis and debounce, held in arrays.
+
+    A free space becomes occupied once its count reaches ``enter_threshold``;
+    an occupied one only frees up when the count drops below
+    ``exit_threshold``. Either way the new reading must persist for
+    ``debounce`` consecutive frames before the state flips, so shadows and
+    passing cars do not cause flicker.
+    """
+
+    def __init__(self, enter_threshold: int = 900, exit_threshold: int = 750, debounce: int = 3):
+        if exit_threshold > enter_threshold:
+            raise ValueError("The exit threshold cannot be above the enter threshold")
+        self.enter_threshold = enter_threshold
+        self.exit_threshold = exit_threshold
+        self.debounce = debounce
+        self.rects: Optional[np.ndarray] = None
+        self.occupied = np.zeros(0, dtype=bool)
+        self.pending = np.zeros(0, dtype=np.int32)
+        self.changed = np.zeros(0, dtype=np.intp)
+
+    def reset(self):
+        """Forget all state; the next update takes its readings as they are."""
+        self.rects = None
+
+    def update(self, counts: np.ndarray, rects: np.ndarray) -> np.ndarray:
+        """Advance every space by one frame of counts; returns the occupied flags.
+
+        Indices of spaces that flipped are left in ``changed``.
+        """
+        if self.rects is not rects or len(self.occupied) != len(counts):
+            # New layout: nothing to debounce against yet
+            self.rects = rects
+            self.occupied = counts >= self.enter_threshold
+            self.pending = np.zeros(len(counts), dtype=np.int32)
+            self.changed = np.arange(len(counts))
+            return self.occupied
+
+        reading = np.where(self.occupied, counts >= self.exit_threshold, counts >= self.enter_threshold)
+        disagree = reading != self.occupied
+        self.pending = np.where(disagree, self.pending + 1, 0)
+        flip = self.pending >= self.debounce
+        self.changed = np.flatnonzero(flip)
+        if len(self.changed):
+            self.occupied = self.occupied ^ flip
+            self.pending[flip] = 0
+        return self.occupied
@@ -0,0 +1,159 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+import cv2
+import numpy as np
+from models.parking_space import STATUS_NAMES
+
+STATUS_COLORS: Dict[str, Tuple[int, int, int]] = {
+    "free": (0, 255, 0),  # BGR: Green
+    "booked": (255, 255, 0),  # BGR: Yellow
+    "occupied": (0, 0, 255),  # BGR: Red
+}
+LINE_THICKNESS = 2
+LABEL_FONT = cv2.FONT_HERSHEY_SIMPLEX
+LABEL_SCALE = 0.5
+
+
+def draw_space(img: np.ndarray, space_id: str, rect: Sequence[int], color, offset=(0, 0)):
+    """Draw one space's outline and label, shifted by ``-offset`` into ``img``."""
+    x, y, width, height = rect
+    x -= offset[0]
+    y -= offset[1]
+    cv2.rectangle(img, (x, y), (x + width, y + height), color, LINE_THICKNESS)
+    cv2.putText(img, space_id, (x + 5, y + height - 10),
+                LABEL_FONT, LABEL_SCALE, color, LINE_THICKNESS)
+
+
+class SpaceOverlay:
+    """Prerendered space outlines and labels, blended onto frames with an alpha mask.
+
+    For each layout, every space gets an alpha mask of its own pixels and one
+    premultiplied sprite per status color. The overlay (premultiplied color
+    plus alpha) is assembled from those sprites, and when a space's status
+    changes only its box is rebuilt, so no text is rendered per frame. Fully
+    covered pixels are copied through a mask and only the anti-aliased edge
+    pixels are blended, so compositing stays cheap however many spaces are
+    labeled.
+    """
+
+    def __init__(self):
+        self.key = None
+        self.boxes: List[Tuple[int, int, int, int]] = []
+        self.alphas: List[np.ndarray] = []
+        self.sprites: List[List[np.ndarray]] = []
+        self.neighbors: List[List[int]] = []
+        self.statuses = np.zeros(0, dtype=np.int8)
+        self.color: Optional[np.ndarray] = None
+        self.alpha: Optional[np.ndarray] = None
+        self.opaque: Optional[np.ndarray] = None
+        self.partial = np.zeros(0, dtype=np.intp)
+        self.partial_weight = np.zeros((0, 3), dtype=np.uint16)
+        self.partial_color = np.zeros((0, 3), dtype=np.uint16)
+
+    def set_layout(self, shape: Tuple[int, ...], space_ids: Sequence[str], rects: np.ndarray):
+        """Prerender the sprites for a layout, unless it is the one already built."""
+        key = (tuple(shape), tuple(space_ids), rects.tobytes())
+        if key == self.key:
+            return
+        height, width = shape[:2]
+        self.boxes = []
+        self.alphas = []
+        self.sprites = []
+        for space_id, rect in zip(space_ids, rects.tolist()):
+            x0, y0, x1, y1 = self._label_bounds(space_id, rect)
+            x0, y0 = min(max(x0, 0), width), min(max(y0, 0), height)
+            x1, y1 = max(min(x1, width), x0), max(min(y1, height), y0)
+            alpha = np.zeros((y1 - y0, x1 - x0, 3), dtype=np.uint8)
+            # One sprite per status code
+            sprites = [np.zeros_like(alpha) for _ in STATUS_NAMES]
+            if alpha.size:  # Spaces entirely off-frame draw nothing
+                draw_space(alpha, space_id, rect, (255, 255, 255), offset=(x0, y0))
+                for sprite, status in zip(sprites, STATUS_NAMES):
+                    draw_space(sprite, space_id, rect, STATUS_COLORS[status], offset=(x0, y0))
+            self.boxes.append((x0, y0, x1, y1))
+            self.alphas.append(alpha)
+            self.sprites.append(sprites)
+
+        boxes = np.array(self.boxes, dtype=np.int32).reshape(-1, 4)
+        self.neighbors = [
+            np.flatnonzero((boxes[:, 0] < x1) & (x0 < boxes[:, 2])
+                           & (boxes[:, 1] < y1) & (y0 < boxes[:, 3])).tolist()
+            for x0, y0, x1, y1 in self.boxes
+        ]
+        self.statuses = np.full(len(self.boxes), -1, dtype=np.int8)  # -1: not drawn yet
+        self.color = np.zeros((height, width, 3), dtype=np.uint8)
+        self.alpha = np.zeros((height, width, 3), dtype=np.uint8)
+        self.opaque = None
+        self.key = key
+
+    @staticmethod
+    def _label_bounds(space_id: str, rect: Sequence[int]) -> Tuple[int, int, int, int]:
+        """Bounding box that contains everything draw_space paints for a space."""
+        x, y, width, height = rect
+        (text_width, text_height), baseline = cv2.getTextSize(
+            space_id, LABEL_FONT, LABEL_SCALE, LINE_THICKNESS)
+        pad = LINE_THICKNESS + 2
+        text_x, text_y = x + 5, y + height - 10
+        return (min(x, text_x) - pad,
+                min(y, text_y - text_height) - pad,
+                max(x + width, text_x + text_width) + pad + 1,
+                max(y + height, text_y + baseline) + pad + 1)
+
+    def _rebuild(self, i: int):
+        """Recompose space ``i``'s box from every space drawn into it, in drawing order."""
+        x0, y0, x1, y1 = self.boxes[i]
+        if x1 <= x0 or y1 <= y0:
+            return
+        color = self.color[y0:y1, x0:x1]
+        alpha = self.alpha[y0:y1, x0:x1]
+        color[:] = 0
+        alpha[:] = 0
+        for j in self.neighbors[i]:
+            status = self.statuses[j]
+            if status < 0:
+                continue
+            bx0, by0, bx1, by1 = self.boxes[j]
+            ix0, iy0, ix1, iy1 = max(x0, bx0), max(y0, by0), min(x1, bx1), min(y1, by1)
+            if ix1 <= ix0 or iy1 <= iy0:
+                continue
+            region = (slice(iy0 - y0, iy1 - y0), slice(ix0 - x0, ix1 - x0))
+            source = (slice(iy0 - by0, iy1 - by0), slice(ix0 - bx0, ix1 - bx0))
+            sprite = self.sprites[j][status][source]
+            space_alpha = self.alphas[j][source]
+            # "Over" operator on premultiplied color: dst = src + dst * (1 - a)
+            cv2.subtract(color[region], cv2.multiply(color[region], space_alpha, scale=1 / 255),
+                         dst=color[region])
+            cv2.add(color[region], sprite, dst=color[region])
+            cv2.subtract(alpha[region], cv2.multiply(alpha[region], space_alpha, scale=1 / 255),
+                         dst=alpha[region])
+            cv2.add(alpha[region], space_alpha, dst=alpha[region])
+
+    def update(self, statuses: np.ndarray) -> int:
+        """Rebuild the boxes of spaces whose status code changed; returns how many changed."""
+        statuses = np.asarray(statuses, dtype=np.int8)
+        changed = np.flatnonzero(statuses != self.statuses)
+        if not len(changed):
+            return 0
+        self.statuses[changed] = statuses[changed]
+        for i in changed.tolist():
+            self._rebuild(i)
+        if self.opaque is None:
+            # Coverage does not depend on status, so it is split once per layout
+            coverage = self.alpha[:, :, 0]
+            self.opaque = (coverage == 255).astype(np.uint8)
+            self.partial = np.flatnonzero((coverage > 0) & (coverage < 255))
+            self.partial_weight = 255 - self.alpha.reshape(-1, 3)[self.partial].astype(np.uint16)
+        self.partial_color = self.color.reshape(-1, 3)[self.partial].astype(np.uint16)
+        return len(changed)
+
+    def composite(self, frame: np.ndarray, out: np.ndarray) -> np.ndarray:
+        """Copy ``frame`` into ``out`` with the overlay blended over it."""
+        np.copyto(out, frame)
+        if self.opaque is None:
+            return out
+        cv2.copyTo(self.color, self.opaque, out)
+        if len(self.partial):
+            pixels = out.reshape(-1, 3)
+            edge = pixels[self.partial].astype(np.uint16)
+            blended = (edge * self.partial_weight + 127) // 255 + self.partial_color
+            pixels[self.partial] = np.minimum(blended, 255)
+        return out
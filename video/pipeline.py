@@ -0,0 +1,227 @@
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+import numpy as np
+from PIL import Image
+from models.parking_space import status_codes
+from video.video_processor import VideoProcessor
+from video.frame_buffers import FramePool
+from video.scheduler import FrameScheduler
+
+
+class LatestSlot:
+    """A bounded queue of size one that keeps only the newest item.
+
+    Putting into a full slot replaces the stale item instead of blocking, so a
+    slow consumer sees dropped items rather than a growing backlog.
+    """
+
+    def __init__(self):
+        self._item = None
+        self._has_item = False
+        self._cond = threading.Condition()
+        self.dropped = 0
+
+    def put(self, item):
+        """Store an item, discarding any item not yet taken; returns the discarded item."""
+        with self._cond:
+            displaced = None
+            if self._has_item:
+                self.dropped += 1
+                displaced = self._item
+            self._item = item
+            self._has_item = True
+            self._cond.notify()
+            return displaced
+
+    def get(self, timeout: Optional[float] = None):
+        """Take the newest item, waiting up to ``timeout`` seconds; None if none arrived."""
+        with self._cond:
+            if not self._has_item:
+                self._cond.wait(timeout)
+            return self._take()
+
+    def get_nowait(self):
+        """Take the newest item if there is one, otherwise return None."""
+        with self._cond:
+            return self._take()
+
+    def _take(self):
+        if not self._has_item:
+            return None
+        item, self._item, self._has_item = self._item, None, False
+        return item
+
+
+@dataclass(frozen=True)
+class Layout:
+    """Snapshot of the space layout the detection worker runs against."""
+    space_ids: Tuple[str, ...]
+    rects: np.ndarray
+    index: Dict[str, int] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, 'index', {space_id: i for i, space_id in enumerate(self.space_ids)})
+
+    def booked_mask(self, booked_spaces: Set[str]) -> np.ndarray:
+        """Boolean array marking the layout's spaces that are in ``booked_spaces``."""
+        mask = np.zeros(len(self.space_ids), dtype=bool)
+        mask[[self.index[space_id] for space_id in booked_spaces if space_id in self.index]] = True
+        return mask
+
+
+@dataclass
+class PipelineResult:
+    """Output of one detection pass, ready to be shown on the Tk thread.
+
+    ``image`` is None when the scheduler skipped drawing this frame. Statuses
+    are left to the Tk thread, which applies its current bookings to ``occupied``;
+    the image is drawn with the bookings as of the render.
+    """
+    frame_index: int
+    layout: Layout
+    occupied: np.ndarray  # Tracked occupancy per space, before bookings are applied
+    image: Optional[Image.Image]
+
+
+class DetectionPipeline:
+    """Decoder and detection threads feeding the latest rendered frame to the UI.
+
+    The decoder thread reads frames into a LatestSlot, the detection worker
+    processes whatever frame is newest, and results land in a second LatestSlot.
+    The Tk side only calls ``latest_result`` and never decodes or processes.
+    A FrameScheduler decides which frames are detected and which are drawn.
+    """
+
+    def __init__(self, video_processor: VideoProcessor,
+                 get_booked_spaces: Callable[[datetime], Set[str]],
+                 scheduler: Optional[FrameScheduler] = None, display_width: int = 1000):
+        self.video_processor = video_processor
+        self.get_booked_spaces = get_booked_spaces
+        self.scheduler = scheduler if scheduler is not None else FrameScheduler()
+        self.display_width = display_width
+        self.display_box: Optional[Tuple[int, int]] = None
+        self.layout = Layout((), np.zeros((0, 4), dtype=np.int32))
+        self.frames = LatestSlot()
+        self.frame_pool = FramePool()
+        self.results = LatestSlot()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def set_layout(self, space_ids: Sequence[str], rects: np.ndarray):
+        """Switch the worker to a new space layout."""
+        self.layout = Layout(tuple(space_ids), rects)
+
+    def set_display_box(self, width: int, height: int):
+        """Fit rendered images inside a ``width`` x ``height`` area from now on."""
+        self.display_box = (width, height)
+
+    @property
+    def frame_interval(self) -> float:
+        return self.scheduler.frame_interval
+
+    def display_size(self, frame_shape: Tuple[int, ...]) -> Tuple[int, int]:
+        """Size to render a frame of ``frame_shape`` at."""
+        box = self.display_box
+        if box is None:
+            return VideoProcessor.fit_display_size(frame_shape, self.display_width)
+        return VideoProcessor.fit_display_size(frame_shape, *box)
+
+    def start(self):
+        """Start the decoder and detection threads."""
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._decode_loop, name="video-decoder", daemon=True),
+            threading.Thread(target=self._detect_loop, name="video-detector", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        """Stop both threads and wait for them to exit."""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def toggle_pause(self) -> bool:
+        """Pause or resume the video; returns True if it is now paused."""
+        self.video_processor.toggle_pause()
+        return self.video_processor.is_paused
+
+    def latest_result(self) -> Optional[PipelineResult]:
+        """Return the newest unseen result, or None if nothing new is ready."""
+        return self.results.get_nowait()
+
+    @property
+    def dropped_frames(self) -> int:
+        """Number of decoded frames the detector never got to."""
+        return self.frames.dropped
+
+    def _decode_loop(self):
+        frame_index = 0
+        frame_shape = None
+        next_time = time.monotonic()
+        while not self._stop.is_set():
+            # Decode into a recycled frame once the video's frame size is known
+            buf = self.frame_pool.acquire(frame_shape) if frame_shape is not None else None
+            with self.scheduler.timed('decode'):
+                success, frame = self.video_processor.read_frame(out=buf)
+            if frame is not buf:
+                self.frame_pool.release(buf)
+            if success:
+                frame_index += 1
+                frame_shape = frame.shape
+                displaced = self.frames.put((frame_index, frame))
+                if displaced is not None:
+                    self.frame_pool.release(displaced[1])
+            next_time += self.frame_interval
+            delay = next_time - time.monotonic()
+            if delay > 0:
+                self._stop.wait(delay)
+            else:
+                # Fell behind; don't try to catch up with a burst of reads
+                next_time = time.monotonic()
+
+    def _detect_loop(self):
+        occupied, detected_layout = None, None
+        while not self._stop.is_set():
+            item = self.frames.get(timeout=0.5)
+            if item is None:
+                continue
+            frame_index, frame = item
+            layout = self.layout
+            detect, display = self.scheduler.plan()
+            if detect or layout is not detected_layout:
+                occupied = self.detect(frame, layout)
+                detected_layout = layout
+                self.publish(self.render(frame_index, frame, layout, occupied, draw=display))
+            elif display:
+                # Redraw with the last detection's occupancy; bookings may still have changed
+                self.publish(self.render(frame_index, frame, layout, occupied))
+            self.frame_pool.release(frame)
+
+    def publish(self, result: PipelineResult):
+        """Hand a result to the UI, keeping an unshown image if the new result has none."""
+        displaced = self.results.put(result)
+        if displaced is not None and result.image is None:
+            result.image = displaced.image
+
+    def detect(self, frame: np.ndarray, layout: Layout) -> np.ndarray:
+        """Run detection for one frame against ``layout``."""
+        with self.scheduler.timed('detect'):
+            return self.video_processor.detect_occupancy(frame, layout.rects)
+
+    def render(self, frame_index: int, frame: np.ndarray, layout: Layout,
+               occupied: np.ndarray, draw: bool = True) -> PipelineResult:
+        """Package a detection result, drawing the display image with current bookings if ``draw``."""
+        image = None
+        if draw:
+            booked_spaces = self.get_booked_spaces(datetime.now())
+            statuses = status_codes(occupied, layout.booked_mask(booked_spaces))
+            with self.scheduler.timed('render'):
+                image = self.video_processor.render_display(
+                    frame, layout.space_ids, layout.rects, statuses, self.display_size(frame.shape))
+        return PipelineResult(frame_index, layout, occupied, image)
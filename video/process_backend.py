@@ -0,0 +1,124 @@
+import multiprocessing as mp
+import os
+import queue
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+import numpy as np
+from video.cameras import CameraConfig
+
+
+@dataclass
+class CameraStatus:
+    """Latest detection output for one camera, as sent back by a worker."""
+    camera_id: str
+    frame_index: int
+    occupied: np.ndarray  # uint8 flag per space, in layout order
+
+
+def run_camera_worker(cameras: List[CameraConfig], results, stop_event, frame_interval: float):
+    """Worker process: decode and detect a share of the cameras in a round-robin loop.
+
+    A camera's status is only sent when a space flips (or a layout change
+    resets its tracker), and re-sent if the queue was full at the time.
+    """
+    # Imported here so spawned workers only load OpenCV once they start
+    from models.layout_store import LayoutStore, LayoutError, empty_rects
+    from video.video_processor import VideoProcessor
+
+    processors = {camera.camera_id: VideoProcessor(camera.video_path) for camera in cameras}
+    stores = {camera.camera_id: LayoutStore(camera.layout_path, camera.legacy_layout_path)
+              for camera in cameras}
+    unsent = {camera.camera_id for camera in cameras}
+    frame_index = 0
+    next_time = time.monotonic()
+    try:
+        while not stop_event.is_set():
+            frame_index += 1
+            for camera in cameras:
+                try:
+                    rects = stores[camera.camera_id].load()
+                except (OSError, LayoutError) as e:
+                    print(f"Error loading layout for camera {camera.camera_id}: {e}")
+                    rects = empty_rects()
+                success, frame = processors[camera.camera_id].read_frame()
+                if not success:
+                    continue
+                processor = processors[camera.camera_id]
+                occupied = processor.detect_occupancy(frame, rects)
+                if len(processor.occupancy.changed):
+                    unsent.add(camera.camera_id)
+                if camera.camera_id not in unsent:
+                    continue
+                try:
+                    results.put_nowait(CameraStatus(camera.camera_id, frame_index,
+                                                    occupied.astype(np.uint8)))
+                    unsent.discard(camera.camera_id)
+                except queue.Full:
+                    pass  # UI is behind; try again on the next frame
+            next_time += frame_interval
+            delay = next_time - time.monotonic()
+            if delay > 0:
+                stop_event.wait(delay)
+            else:
+                next_time = time.monotonic()
+    finally:
+        for processor in processors.values():
+            processor.release()
+
+
+class ProcessDetectionBackend:
+    """Runs detection for a set of cameras in worker processes.
+
+    Cameras are spread round-robin over up to one process per core. Only small
+    per-space status arrays come back to the UI process, which keeps the newest
+    one per camera.
+    """
+
+    def __init__(self, cameras: List[CameraConfig], workers: Optional[int] = None,
+                 frame_interval: float = 0.1):
+        self.cameras = list(cameras)
+        if workers is None:
+            workers = os.cpu_count() or 1
+        self.worker_count = max(1, min(workers, len(self.cameras))) if self.cameras else 0
+        self.frame_interval = frame_interval
+        self._context = mp.get_context('spawn')
+        self._results = self._context.Queue(maxsize=max(4 * len(self.cameras), 1))
+        self._stop_event = self._context.Event()
+        self._processes: List[mp.Process] = []
+        self.latest: Dict[str, CameraStatus] = {}
+
+    def start(self):
+        """Start the worker processes; does nothing if there are no cameras."""
+        self._stop_event.clear()
+        for worker in range(self.worker_count):
+            share = self.cameras[worker::self.worker_count]
+            process = self._context.Process(
+                target=run_camera_worker,
+                args=(share, self._results, self._stop_event, self.frame_interval),
+                name=f"camera-worker-{worker}", daemon=True)
+            process.start()
+            self._processes.append(process)
+
+    def poll(self) -> Dict[str, CameraStatus]:
+        """Drain pending results and return the cameras that reported since the last poll."""
+        updated: Dict[str, CameraStatus] = {}
+        while True:
+            try:
+                status = self._results.get_nowait()
+            except queue.Empty:
+                break
+            previous = updated.get(status.camera_id)
+            if previous is None or status.frame_index >= previous.frame_index:
+                updated[status.camera_id] = status
+        self.latest.update(updated)
+        return updated
+
+    def stop(self, timeout: float = 2.0):
+        """Signal the workers to exit and wait for them."""
+        self._stop_event.set()
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
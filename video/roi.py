@@ -0,0 +1,86 @@
+from dataclasses import dataclass
+from typing import List, Tuple
+import numpy as np
+
+Box = Tuple[int, int, int, int]  # x0, y0, x1, y1
+
+
+@dataclass
+class RoiRegion:
+    """One padded crop of the frame and the spaces measured inside it."""
+    box: Box            # padded crop in frame coordinates
+    valid: Box          # part of the crop whose processed pixels match a full-frame pass
+    space_indices: np.ndarray
+    local_rects: np.ndarray  # (n, 4) x0, y0, x1, y1 of each space relative to ``box``
+
+
+@dataclass
+class RoiPlan:
+    """The crops to process for a layout, built once per layout and frame size."""
+    rects: np.ndarray
+    frame_shape: Tuple[int, int]
+    regions: List[RoiRegion]
+
+    @property
+    def coverage(self) -> float:
+        """Fraction of the frame's pixels the plan processes."""
+        frame_h, frame_w = self.frame_shape
+        area = sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in (r.box for r in self.regions))
+        return area / float(frame_h * frame_w) if frame_h and frame_w else 0.0
+
+
+def clip_rects(rects: np.ndarray, frame_shape: Tuple[int, int]) -> np.ndarray:
+    """Convert (x, y, w, h) rects to frame-clipped (x0, y0, x1, y1) boxes."""
+    frame_h, frame_w = frame_shape
+    x0 = np.clip(rects[:, 0], 0, frame_w)
+    y0 = np.clip(rects[:, 1], 0, frame_h)
+    x1 = np.clip(rects[:, 0] + rects[:, 2], x0, frame_w)
+    y1 = np.clip(rects[:, 1] + rects[:, 3], y0, frame_h)
+    return np.stack([x0, y0, x1, y1], axis=1)
+
+
+def _overlaps(a: Box, b: Box) -> bool:
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+def merge_boxes(boxes: List[Box]) -> List[Tuple[Box, List[int]]]:
+    """Merge overlapping boxes into their bounding boxes until none overlap.
+
+    Returns (box, member indices) pairs.
+    """
+    groups = [(box, [i]) for i, box in enumerate(boxes)]
+    merged = True
+    while merged:
+        merged = False
+        result: List[Tuple[Box, List[int]]] = []
+        for box, members in groups:
+            for j, (other, other_members) in enumerate(result):
+                if _overlaps(box, other):
+                    result[j] = ((min(box[0], other[0]), min(box[1], other[1]),
+                                  max(box[2], other[2]), max(box[3], other[3])),
+                                 other_members + members)
+                    merged = True
+                    break
+            else:
+                result.append((box, members))
+        groups = result
+    return groups
+
+
+def build_roi_plan(rects: np.ndarray, frame_shape: Tuple[int, int], pad: int) -> RoiPlan:
+    """Group the layout's spaces into padded, non-overlapping crops."""
+    frame_h, frame_w = frame_shape
+    boxes = clip_rects(rects, frame_shape)
+    padded = [(max(x0 - pad, 0), max(y0 - pad, 0), min(x1 + pad, frame_w), min(y1 + pad, frame_h))
+              for x0, y0, x1, y1 in boxes.tolist()]
+
+    regions = []
+    for box, members in merge_boxes(padded):
+        x0, y0, x1, y1 = box
+        # Edges clipped by the frame see the same borders as a full-frame pass
+        valid = (x0 + pad if x0 > 0 else 0, y0 + pad if y0 > 0 else 0,
+                 x1 - pad if x1 < frame_w else frame_w, y1 - pad if y1 < frame_h else frame_h)
+        indices = np.array(sorted(members), dtype=np.intp)
+        local = boxes[indices] - np.array([x0, y0, x0, y0])
+        regions.append(RoiRegion(box, valid, indices, local))
+    return RoiPlan(rects, (frame_h, frame_w), regions)
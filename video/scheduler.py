@@ -0,0 +1,142 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Deque, Dict, Optional, Tuple
+from metrics.registry import MetricsRegistry
+
+
+class RateMeter:
+    """Reports how often an event happened over a sliding time window."""
+
+    def __init__(self, window: float = 2.0, clock: Callable[[], float] = time.monotonic):
+        self.window = window
+        self.clock = clock
+        self._times: Deque[float] = deque()
+        self._lock = threading.Lock()
+
+    def tick(self):
+        """Record one occurrence now."""
+        now = self.clock()
+        with self._lock:
+            self._times.append(now)
+            self._trim(now)
+
+    def rate(self) -> float:
+        """Occurrences per second over the window."""
+        now = self.clock()
+        with self._lock:
+            self._trim(now)
+            if len(self._times) < 2:
+                return 0.0
+            span = max(now - self._times[0], self._times[-1] - self._times[0])
+            return (len(self._times) - 1) / span if span > 0 else 0.0
+
+    def _trim(self, now: float):
+        while self._times and now - self._times[0] > self.window:
+            self._times.popleft()
+
+
+class FrameScheduler:
+    """Decides per frame whether to run detection and whether to redraw the display.
+
+    Detection and display have separate target rates. The cost of each stage
+    is tracked as a moving average; when hitting both targets would take more
+    than ``budget`` of the worker's time, the display rate is lowered first,
+    and detection only slows once the display is down to ``min_display_fps``.
+    Measured stage times also go to ``metrics`` as ``pipeline.<stage>``.
+    """
+
+    STAGES = ('decode', 'detect', 'render', 'present')
+
+    def __init__(self, detect_fps: float = 10.0, display_fps: float = 10.0,
+                 min_display_fps: float = 1.0, min_detect_fps: float = 0.5,
+                 budget: float = 0.9, smoothing: float = 0.2,
+                 clock: Callable[[], float] = time.monotonic,
+                 metrics: Optional[MetricsRegistry] = None):
+        if detect_fps <= 0 or display_fps <= 0:
+            raise ValueError("Frame rates must be positive")
+        self.detect_fps = detect_fps
+        self.display_fps = display_fps
+        self.min_display_fps = min(min_display_fps, display_fps)
+        self.min_detect_fps = min(min_detect_fps, detect_fps)
+        self.budget = budget
+        self.smoothing = smoothing
+        self.clock = clock
+        self.metrics = metrics
+        self.costs: Dict[str, float] = {stage: 0.0 for stage in self.STAGES}
+        self.meters: Dict[str, RateMeter] = {stage: RateMeter(clock=clock) for stage in self.STAGES}
+        self._next_detect = 0.0
+        self._next_display = 0.0
+
+    @property
+    def frame_interval(self) -> float:
+        """Seconds between decoded frames: enough to feed the faster of the two rates."""
+        return 1.0 / max(self.detect_fps, self.display_fps)
+
+    def record(self, stage: str, seconds: float):
+        """Fold one measured run of ``stage`` into its average cost and rate."""
+        previous = self.costs[stage]
+        self.costs[stage] = seconds if previous == 0.0 else previous + self.smoothing * (seconds - previous)
+        self.meters[stage].tick()
+        if self.metrics is not None:
+            self.metrics.observe(f"pipeline.{stage}", seconds * 1000.0)
+
+    @contextmanager
+    def timed(self, stage: str):
+        """Time the enclosed block as one run of ``stage``."""
+        start = self.clock()
+        try:
+            yield
+        finally:
+            self.record(stage, self.clock() - start)
+
+    def effective_rates(self) -> Tuple[float, float]:
+        """(detection, display) rates the measured stage costs allow."""
+        detect_cost = self.costs['detect']
+        display_cost = self.costs['render'] + self.costs['present']
+        detect, display = self.detect_fps, self.display_fps
+        if detect_cost * detect + display_cost * display <= self.budget:
+            return detect, display
+        # Give up display frames first...
+        if display_cost > 0:
+            display = (self.budget - detect_cost * detect) / display_cost
+            display = min(max(display, self.min_display_fps), self.display_fps)
+        # ...and detection frames only once the display is at its floor
+        if detect_cost > 0 and detect_cost * detect + display_cost * display > self.budget:
+            detect = (self.budget - display_cost * display) / detect_cost
+            detect = min(max(detect, self.min_detect_fps), self.detect_fps)
+        return detect, display
+
+    def plan(self) -> Tuple[bool, bool]:
+        """Whether the frame arriving now should be (detected, displayed)."""
+        now = self.clock()
+        detect_fps, display_fps = self.effective_rates()
+        # Frames arrive on a grid, so allow half a frame of slack around each deadline
+        slack = self.frame_interval / 2
+        detect = now + slack >= self._next_detect
+        if detect:
+            self._next_detect = self._advance(self._next_detect, 1.0 / detect_fps, now)
+        display = now + slack >= self._next_display
+        if display:
+            self._next_display = self._advance(self._next_display, 1.0 / display_fps, now)
+        return detect, display
+
+    @staticmethod
+    def _advance(deadline: float, interval: float, now: float) -> float:
+        deadline += interval
+        # After a stall, restart from now instead of firing a burst to catch up
+        return deadline if deadline > now - interval else now + interval
+
+    def poll_delay(self, elapsed: float = 0.0) -> float:
+        """Seconds until the UI should next check for results, given its last tick took ``elapsed``.
+
+        Polls twice per display interval, so a poll landing just before a frame
+        is ready does not cost that frame.
+        """
+        _, display_fps = self.effective_rates()
+        return max(0.5 / display_fps - elapsed, 0.005)
+
+    def rates(self) -> Dict[str, float]:
+        """Achieved detection and display rates, in frames per second."""
+        return {'detect': self.meters['detect'].rate(), 'display': self.meters['present'].rate()}
@@ -0,0 +1,70 @@
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+import numpy as np
+
+
+class SharedFrameRing:
+    """A ring of frame slots in shared memory, guarded by per-slot sequence numbers.
+
+    The writer marks a slot as busy (-1), decodes straight into it and then
+    publishes the frame's sequence number. Readers pass around only (slot, seq)
+    pairs and check the slot still holds that sequence after reading, so a
+    slot overwritten mid-read is detected and the frame dropped.
+    """
+
+    BUSY = -1
+
+    def __init__(self, shape: Tuple[int, ...], slots: int = 4, name: Optional[str] = None):
+        self.shape = tuple(shape)
+        self.slots = slots
+        frame_bytes = int(np.prod(self.shape))
+        header_bytes = slots * np.dtype(np.int64).itemsize
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=header_bytes + slots * frame_bytes)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.sequences = np.ndarray((slots,), dtype=np.int64, buffer=self.shm.buf)
+        self.frames = np.ndarray((slots,) + self.shape, dtype=np.uint8,
+                                 buffer=self.shm.buf, offset=header_bytes)
+        if self.owner:
+            self.sequences[:] = 0
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def slot_for(self, seq: int) -> int:
+        """Slot a writer should use for sequence number ``seq``."""
+        return seq % self.slots
+
+    def begin_write(self, seq: int) -> np.ndarray:
+        """Mark the slot for ``seq`` busy and return its frame array to fill."""
+        slot = self.slot_for(seq)
+        self.sequences[slot] = self.BUSY
+        return self.frames[slot]
+
+    def end_write(self, seq: int) -> int:
+        """Publish ``seq`` in its slot; returns the slot index to send to readers."""
+        slot = self.slot_for(seq)
+        self.sequences[slot] = seq
+        return slot
+
+    def view(self, slot: int, seq: int) -> Optional[np.ndarray]:
+        """Return the slot's frame if it still holds ``seq``, otherwise None."""
+        if self.sequences[slot] != seq:
+            return None
+        return self.frames[slot]
+
+    def is_current(self, slot: int, seq: int) -> bool:
+        """Check a frame read from ``slot`` was not overwritten while it was being read."""
+        return self.sequences[slot] == seq
+
+    def close(self):
+        """Detach from the shared memory, removing it if this ring created it."""
+        # Drop the numpy views first; SharedMemory refuses to close while they exist
+        self.sequences = None
+        self.frames = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
@@ -0,0 +1,172 @@
+import multiprocessing as mp
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Optional, Set, Tuple
+import numpy as np
+from video.pipeline import DetectionPipeline
+from video.scheduler import FrameScheduler
+from video.shared_frames import SharedFrameRing
+from video.video_processor import VideoProcessor
+
+
+def run_shared_frame_worker(video_path: str, ring_name: str, frame_shape: Tuple[int, ...],
+                            slots: int, commands, messages, stop_event, frame_interval: float):
+    """Worker process: decode straight into the shared ring and detect occupancy there.
+
+    Only (seq, slot, layout version, uint8 occupancy flags, detection seconds)
+    go back over ``messages``.
+    """
+    ring = SharedFrameRing(frame_shape, slots, name=ring_name)
+    processor = VideoProcessor(video_path)
+    rects = np.zeros((0, 4), dtype=np.int32)
+    layout_version = 0
+    seq = 0
+    next_time = time.monotonic()
+    try:
+        while not stop_event.is_set():
+            while True:
+                try:
+                    command = commands.get_nowait()
+                except queue.Empty:
+                    break
+                if command[0] == 'layout':
+                    layout_version, rects = command[1], command[2]
+                elif command[0] == 'pause' and command[1] != processor.is_paused:
+                    processor.toggle_pause()
+
+            seq += 1
+            out = ring.begin_write(seq)
+            success, frame = processor.read_frame(out=out)
+            if success and frame is not out:
+                if frame.shape != out.shape:
+                    success = False  # Stream changed resolution; the ring cannot hold it
+                else:
+                    np.copyto(out, frame)  # Paused: re-publish the held frame
+            if success:
+                started = time.monotonic()
+                occupied = processor.detect_occupancy(out, rects)
+                elapsed = time.monotonic() - started
+                slot = ring.end_write(seq)
+                try:
+                    messages.put_nowait((seq, slot, layout_version, occupied.astype(np.uint8), elapsed))
+                except queue.Full:
+                    pass  # Renderer is behind; it skips to the newest message anyway
+
+            next_time += frame_interval
+            delay = next_time - time.monotonic()
+            if delay > 0:
+                stop_event.wait(delay)
+            else:
+                next_time = time.monotonic()
+    finally:
+        processor.release()
+        ring.close()
+
+
+class SharedFramePipeline(DetectionPipeline):
+    """DetectionPipeline variant that decodes and detects in a separate process.
+
+    Frames travel through a SharedFrameRing, so a 1080p frame is never pickled:
+    the worker decodes into a slot, and a render thread in this process draws
+    the overlay straight from that slot. Results reach the Tk side through the
+    same ``latest_result`` interface as the threaded pipeline. The worker
+    detects at the scheduler's detection rate; the scheduler decides here which
+    of those frames are drawn.
+    """
+
+    def __init__(self, video_processor: VideoProcessor,
+                 get_booked_spaces: Callable[[datetime], Set[str]],
+                 scheduler: Optional[FrameScheduler] = None, display_width: int = 1000,
+                 slots: int = 4):
+        super().__init__(video_processor, get_booked_spaces, scheduler, display_width)
+        self.slots = slots
+        self.ring: Optional[SharedFrameRing] = None
+        self.layout_version = 0
+        self.paused = False
+        self.torn_frames = 0
+        self.skipped_messages = 0
+        self._context = mp.get_context('spawn')
+        self._commands = self._context.Queue()
+        self._messages = self._context.Queue(maxsize=8)
+        self._stop_event = self._context.Event()
+        self._process: Optional[mp.Process] = None
+        self._current = (self.layout_version, self.layout)
+
+    def set_layout(self, space_ids, rects: np.ndarray):
+        """Switch to a new layout here and in the worker."""
+        super().set_layout(space_ids, rects)
+        self.layout_version += 1
+        self._current = (self.layout_version, self.layout)
+        self._commands.put(('layout', self.layout_version, np.asarray(rects)))
+
+    def toggle_pause(self) -> bool:
+        """Pause or resume the worker's video; returns True if it is now paused."""
+        self.paused = not self.paused
+        self._commands.put(('pause', self.paused))
+        return self.paused
+
+    @property
+    def dropped_frames(self) -> int:
+        """Frames the worker published that were never drawn."""
+        return self.skipped_messages + self.torn_frames
+
+    def start(self):
+        """Create the frame ring, then start the worker process and the render thread."""
+        frame_shape = self.video_processor.frame_shape()
+        self.ring = SharedFrameRing(frame_shape, self.slots)
+        self._stop.clear()
+        self._stop_event.clear()
+        self._process = self._context.Process(
+            target=run_shared_frame_worker,
+            args=(self.video_processor.video_path, self.ring.name, frame_shape, self.slots,
+                  self._commands, self._messages, self._stop_event, 1.0 / self.scheduler.detect_fps),
+            name="shared-frame-worker", daemon=True)
+        self._process.start()
+        self._threads = [threading.Thread(target=self._render_loop, name="frame-renderer", daemon=True)]
+        self._threads[0].start()
+
+    def stop(self, timeout: float = 2.0):
+        """Stop the render thread and worker, then release the shared memory."""
+        self._stop_event.set()
+        super().stop(timeout)
+        if self._process is not None:
+            self._process.join(timeout)
+            if self._process.is_alive():
+                self._process.terminate()
+            self._process = None
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+
+    def _render_loop(self):
+        while not self._stop.is_set():
+            try:
+                message = self._messages.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            # Only the newest frame is worth drawing
+            while True:
+                try:
+                    message = self._messages.get_nowait()
+                    self.skipped_messages += 1
+                except queue.Empty:
+                    break
+
+            seq, slot, layout_version, occupied, detect_seconds = message
+            self.scheduler.record('detect', detect_seconds)
+            current_version, layout = self._current
+            if layout_version != current_version:
+                continue
+            _, display = self.scheduler.plan()
+            frame = self.ring.view(slot, seq) if display else None
+            if display and frame is None:
+                self.torn_frames += 1
+                display = False
+            result = self.render(seq, frame, layout, occupied, draw=display)
+            if display and not self.ring.is_current(slot, seq):
+                # The worker reused the slot while we were drawing from it
+                self.torn_frames += 1
+                result.image = None
+            self.publish(result)
@@ -1,42 +1,124 @@
 import cv2
 import numpy as np
-from typing import List, Tuple, Optional
+from typing import Optional, Sequence, Tuple
 from PIL import Image, ImageTk
-from models.parking_space import ParkingSpace
+from models.parking_space import SpaceTable
+from video.motion_gate import MotionGate
+from video.roi import RoiPlan, build_roi_plan
+from video.frame_buffers import FrameBuffers
+from video.occupancy import OccupancyTracker
+from video.overlay import SpaceOverlay
 
 class VideoProcessor:
-    def __init__(self, video_path: str):
+    OCCUPANCY_THRESHOLD = 900  # Non-zero pixels needed to call a space occupied
+    VACANCY_THRESHOLD = 750  # An occupied space stays occupied until it drops below this
+    DEBOUNCE_FRAMES = 3  # Consecutive frames a new reading must hold before a space flips
+    # Reach of the filter chain: Gaussian 1 + adaptive threshold 12 + median 2 + dilate 1
+    PROCESS_PAD = 16
+    # Above this share of changed spaces one full-frame pass is cheaper than crops
+    FULL_FRAME_FRACTION = 0.5
+    DILATE_KERNEL = np.ones((3, 3), np.uint8)
+
+    def __init__(self, video_path: str, motion_gating: bool = True, roi_mode: bool = True):
         self.video_path = video_path
         self.cap = cv2.VideoCapture(video_path)
         self.current_frame = None
+        self.paused_frame = None
         self.current_dilate = None
         self.is_paused = False
+        self.buffers = FrameBuffers()
+        self.overlay = SpaceOverlay()
+        self.display_rects = None
+        self.motion_gate = (MotionGate(margin=self.PROCESS_PAD, buffers=self.buffers)
+                            if motion_gating else None)
+        self.last_counts = None
+        self.occupancy = OccupancyTracker(self.OCCUPANCY_THRESHOLD, self.VACANCY_THRESHOLD,
+                                          self.DEBOUNCE_FRAMES)
+        self.roi_mode = roi_mode
+        self.roi_plan: Optional[RoiPlan] = None
+
+    def read_frame(self, out: Optional[np.ndarray] = None) -> Tuple[bool, Optional[np.ndarray]]:
+        """Read a frame from the video, decoding into ``out`` when it is given.
 
-    def read_frame(self) -> Tuple[bool, Optional[np.ndarray]]:
-        """Read a frame from the video."""
+        While paused this returns a read-only view of the frame shown when the
+        pause began, which is copied once rather than on every call.
+        """
         if self.is_paused and self.current_frame is not None:
-            return True, self.current_frame.copy()
+            if self.paused_frame is None:
+                self.paused_frame = self.current_frame.copy()
+            view = self.paused_frame.view()
+            view.flags.writeable = False
+            return True, view
         
-        success, img = self.cap.read()
+        success, img = self.cap.read(out)
         if not success:
             self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-            success, img = self.cap.read()
+            success, img = self.cap.read(out)
         
         if success:
-            self.current_frame = img.copy()
+            self.current_frame = img
         return success, img
 
+    def frame_shape(self) -> Tuple[int, int, int]:
+        """Shape of the video's decoded BGR frames."""
+        width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        if width <= 0 or height <= 0:
+            # Some backends only know the size after decoding a frame
+            success, img = self.cap.read()
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            if not success:
+                raise ValueError(f"Could not read a frame from '{self.video_path}'")
+            return img.shape
+        return height, width, 3
+
     def process_frame(self, frame: np.ndarray) -> np.ndarray:
-        """Process a frame for space detection."""
-        imgGray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        imgBlur = cv2.GaussianBlur(imgGray, (3, 3), 1)
+        """Process a frame for space detection.
+
+        The result is written into ``current_dilate``, which is reused by later calls.
+        """
+        frame_shape = frame.shape[:2]
+        if self.current_dilate is None or self.current_dilate.shape != frame_shape:
+            self.current_dilate = np.empty(frame_shape, dtype=np.uint8)
+        return self.filter_chain(frame, dst=self.current_dilate)
+
+    def filter_chain(self, frame: np.ndarray, dst: Optional[np.ndarray] = None) -> np.ndarray:
+        """Run the detection filters over a BGR image and return the binary result.
+
+        Intermediates live in reusable buffers; without ``dst`` the result does too,
+        so it is only valid until the next call with the same image size.
+        """
+        shape = frame.shape[:2]
+        buffers = self.buffers
+        imgGray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=buffers.get('gray', shape))
+        imgBlur = cv2.GaussianBlur(imgGray, (3, 3), 1, dst=buffers.get('blur', shape))
         imgThreshold = cv2.adaptiveThreshold(imgBlur, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-                                           cv2.THRESH_BINARY_INV, 25, 16)
-        imgMedian = cv2.medianBlur(imgThreshold, 5)
-        kernel = np.ones((3, 3), np.uint8)
-        imgDilate = cv2.dilate(imgMedian, kernel, iterations=1)
-        self.current_dilate = imgDilate.copy()
-        return imgDilate
+                                           cv2.THRESH_BINARY_INV, 25, 16,
+                                           dst=buffers.get('threshold', shape))
+        imgMedian = cv2.medianBlur(imgThreshold, 5, dst=buffers.get('median', shape))
+        if dst is None:
+            dst = buffers.get('dilate', shape)
+        return cv2.dilate(imgMedian, self.DILATE_KERNEL, dst=dst, iterations=1)
+
+    def nonzero_integral(self, binary: np.ndarray) -> np.ndarray:
+        """Summed-area table of the non-zero pixels of a binary image, in reused buffers."""
+        height, width = binary.shape[:2]
+        mask = cv2.threshold(binary, 0, 1, cv2.THRESH_BINARY,
+                             dst=self.buffers.get('mask', (height, width)))[1]
+        return cv2.integral(mask, sum=self.buffers.get('integral', (height + 1, width + 1), np.int32),
+                            sdepth=cv2.CV_32S)
+
+    def process_region(self, frame: np.ndarray, x0: int, y0: int, x1: int, y1: int) -> np.ndarray:
+        """Process only frame[y0:y1, x0:x1], matching what process_frame gives there.
+
+        The filters run on a crop padded by PROCESS_PAD so border handling at the
+        crop edge cannot reach the returned region.
+        """
+        frame_h, frame_w = frame.shape[:2]
+        px0, py0 = max(x0 - self.PROCESS_PAD, 0), max(y0 - self.PROCESS_PAD, 0)
+        px1, py1 = min(x1 + self.PROCESS_PAD, frame_w), min(y1 + self.PROCESS_PAD, frame_h)
+        processed = self.filter_chain(frame[py0:py1, px0:px1])
+        return processed[y0 - py0:y1 - py0, x0 - px0:x1 - px0]
 
     def check_space_occupancy(self, pos: Tuple[int, int], size: Tuple[int, int], 
                             processed_frame: np.ndarray) -> bool:
@@ -45,41 +127,176 @@ class VideoProcessor:
         width, height = size
         imgCrop = processed_frame[y:y + height, x:x + width]
         count = cv2.countNonZero(imgCrop)
-        return count >= 900
+        return count >= self.OCCUPANCY_THRESHOLD
 
-    def draw_spaces(self, frame: np.ndarray, spaces: List[ParkingSpace]) -> np.ndarray:
-        """Draw parking spaces on the frame."""
-        img = frame.copy()
-        for space in spaces:
-            x, y = space.position
-            width, height = space.size
-            
-            # Set color based on status
-            if space.status == "free":
-                color = (0, 255, 0)  # BGR: Green
-            elif space.status == "booked":
-                color = (255, 255, 0)  # BGR: Yellow
-            else:  # occupied
-                color = (0, 0, 255)  # BGR: Red
+    def count_spaces(self, rects: np.ndarray, processed_frame: np.ndarray) -> np.ndarray:
+        """Count non-zero pixels inside every rectangle using one summed-area table.
+
+        ``rects`` is an (N, 4) array of x, y, width, height. Rectangles are clipped
+        to the frame, so a negative x or y counts from the frame edge; this differs
+        from the slicing in check_space_occupancy, where a negative start wraps around.
+        """
+        if len(rects) == 0:
+            return np.zeros(0, dtype=np.int64)
+        frame_h, frame_w = processed_frame.shape[:2]
+        integral = self.nonzero_integral(processed_frame)
+
+        x0 = np.clip(rects[:, 0], 0, frame_w)
+        y0 = np.clip(rects[:, 1], 0, frame_h)
+        x1 = np.clip(rects[:, 0] + rects[:, 2], x0, frame_w)
+        y1 = np.clip(rects[:, 1] + rects[:, 3], y0, frame_h)
+        counts = (integral[y1, x1].astype(np.int64) - integral[y0, x1]
+                  - integral[y1, x0] + integral[y0, x0])
+        return counts
+
+    def check_spaces_occupancy(self, rects: np.ndarray, processed_frame: np.ndarray) -> np.ndarray:
+        """Check occupancy of every rectangle at once; returns a boolean array."""
+        return self.count_spaces(rects, processed_frame) >= self.OCCUPANCY_THRESHOLD
+
+    def get_roi_plan(self, rects: np.ndarray, frame_shape: Tuple[int, int]) -> RoiPlan:
+        """Return the ROI plan for a layout, rebuilding it only when the layout or frame size changes."""
+        plan = self.roi_plan
+        if plan is None or plan.rects is not rects or plan.frame_shape != frame_shape:
+            plan = self.roi_plan = build_roi_plan(rects, frame_shape, self.PROCESS_PAD)
+        return plan
+
+    def process_rois(self, frame: np.ndarray, plan: RoiPlan) -> np.ndarray:
+        """Run the filter chain on the plan's crops only and count every space.
+
+        Counts match count_spaces on a full process_frame pass. The valid part of
+        each crop is written into ``current_dilate``; pixels outside all crops stay 0,
+        so it cannot be used to count spaces outside the plan.
+        """
+        frame_shape = frame.shape[:2]
+        if self.current_dilate is None or self.current_dilate.shape != frame_shape:
+            self.current_dilate = np.zeros(frame_shape, dtype=np.uint8)
+        counts = np.zeros(len(plan.rects), dtype=np.int64)
+        for region in plan.regions:
+            x0, y0, x1, y1 = region.box
+            processed = self.filter_chain(frame[y0:y1, x0:x1])
+            vx0, vy0, vx1, vy1 = region.valid
+            self.current_dilate[vy0:vy1, vx0:vx1] = processed[vy0 - y0:vy1 - y0, vx0 - x0:vx1 - x0]
             
-            thickness = 2
-            cv2.rectangle(img, (x, y), (x + width, y + height), color, thickness)
-            cv2.putText(img, space.id, (x + 5, y + height - 10),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
-        return img
+            integral = self.nonzero_integral(processed)
+            lx0, ly0, lx1, ly1 = region.local_rects.T
+            counts[region.space_indices] = (integral[ly1, lx1].astype(np.int64) - integral[ly0, lx1]
+                                            - integral[ly1, lx0] + integral[ly0, lx0])
+        return counts
+
+    def full_pass_counts(self, frame: np.ndarray, rects: np.ndarray) -> np.ndarray:
+        """Count every space from a fresh pass, over ROI crops or the whole frame."""
+        if self.roi_mode:
+            return self.process_rois(frame, self.get_roi_plan(rects, frame.shape[:2]))
+        return self.count_spaces(rects, self.process_frame(frame))
+
+    def detect_counts(self, frame: np.ndarray, rects: np.ndarray) -> np.ndarray:
+        """Count occupied pixels for every space, re-processing only spaces that moved.
+
+        With motion gating on, spaces the gate reports as unchanged keep their
+        previous count, and changed spaces are re-thresholded on padded crops.
+        Processed crops are written back into ``current_dilate``, which is the
+        detecting thread's working buffer and is overwritten in place.
+        """
+        if self.motion_gate is None:
+            return self.full_pass_counts(frame, rects)
+
+        changed = self.motion_gate.changed_spaces(frame, rects)
+        if (self.last_counts is None or len(self.last_counts) != len(rects)
+                or self.current_dilate is None or self.current_dilate.shape != frame.shape[:2]
+                or changed.mean() > self.FULL_FRAME_FRACTION):
+            self.last_counts = self.full_pass_counts(frame, rects)
+            return self.last_counts
+
+        frame_h, frame_w = frame.shape[:2]
+        for i in np.flatnonzero(changed):
+            x, y, width, height = rects[i].tolist()
+            x0, y0 = min(max(x, 0), frame_w), min(max(y, 0), frame_h)
+            x1, y1 = min(max(x + width, x0), frame_w), min(max(y + height, y0), frame_h)
+            region = self.process_region(frame, x0, y0, x1, y1)
+            self.current_dilate[y0:y1, x0:x1] = region
+            self.last_counts[i] = cv2.countNonZero(region)
+        return self.last_counts
+
+    def detect_occupancy(self, frame: np.ndarray, rects: np.ndarray) -> np.ndarray:
+        """Detect occupancy for every space in a raw frame; returns a boolean array.
+
+        Readings go through the occupancy tracker, so a space only flips after
+        a debounced, hysteresis-crossing change; ``occupancy.changed`` lists
+        the spaces that flipped on this frame.
+        """
+        return self.occupancy.update(self.detect_counts(frame, rects), rects)
+
+    def draw_spaces(self, frame: np.ndarray, spaces: SpaceTable) -> np.ndarray:
+        """Draw parking spaces on the frame."""
+        return self.draw_layout(frame, spaces.ids, spaces.rects, spaces.status)
+
+    def draw_layout(self, frame: np.ndarray, space_ids: Sequence[str], rects: np.ndarray,
+                    statuses: np.ndarray) -> np.ndarray:
+        """Draw spaces given as parallel ids, rectangles and status codes.
+
+        Outlines and labels come from a cached overlay that only repaints the
+        spaces whose status changed. The result is a reused canvas, valid until
+        the next call.
+        """
+        self.overlay.set_layout(frame.shape, space_ids, rects)
+        self.overlay.update(statuses)
+        return self.overlay.composite(frame, self.buffers.get('canvas', frame.shape))
+
+    @staticmethod
+    def fit_display_size(frame_shape: Tuple[int, ...], max_width: int,
+                         max_height: Optional[int] = None) -> Tuple[int, int]:
+        """Largest (width, height) with the frame's aspect ratio that fits the given box."""
+        frame_height, frame_width = frame_shape[:2]
+        scale = max_width / frame_width
+        if max_height is not None:
+            scale = min(scale, max_height / frame_height)
+        return max(int(frame_width * scale), 1), max(int(frame_height * scale), 1)
+
+    def get_display_frame(self, frame: np.ndarray, display_width: int = 1000) -> Image.Image:
+        """Resize a frame for display and convert it to an RGB PIL image.
+
+        Safe to call off the Tk thread; only the PhotoImage must be built on it.
+        """
+        display_width, display_height = self.fit_display_size(frame.shape, display_width)
+        img_resized = cv2.resize(frame, (display_width, display_height),
+                                 dst=self.buffers.get('display', (display_height, display_width, 3)))
+        img_rgb = cv2.cvtColor(img_resized, cv2.COLOR_BGR2RGB,
+                               dst=self.buffers.get('display_rgb', (display_height, display_width, 3)))
+        return Image.fromarray(img_rgb)
+
+    def render_display(self, frame: np.ndarray, space_ids: Sequence[str], rects: np.ndarray,
+                       statuses: np.ndarray, size: Tuple[int, int]) -> Image.Image:
+        """Downscale a frame to ``size`` first, then draw the scaled layout on it.
+
+        Only the display-sized pixels are drawn on and converted, instead of
+        the full-resolution frame.
+        """
+        width, height = size
+        small = cv2.resize(frame, (width, height), dst=self.buffers.get('display', (height, width, 3)))
+        img = self.draw_layout(small, space_ids, self.scale_rects(rects, frame.shape, size), statuses)
+        img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=self.buffers.get('display_rgb', (height, width, 3)))
+        return Image.fromarray(img_rgb)
+
+    def scale_rects(self, rects: np.ndarray, frame_shape: Tuple[int, ...],
+                    size: Tuple[int, int]) -> np.ndarray:
+        """Map frame-space rectangles to display size; cached while the inputs are unchanged."""
+        cached = self.display_rects
+        if cached is not None and cached[0] is rects and cached[1] == (frame_shape[:2], size):
+            return cached[2]
+        scale = np.array([size[0] / frame_shape[1], size[1] / frame_shape[0]] * 2)
+        scaled = np.rint(rects * scale).astype(np.int32).reshape(-1, 4)
+        self.display_rects = (rects, (frame_shape[:2], size), scaled)
+        return scaled
 
     def get_display_image(self, frame: np.ndarray, display_width: int = 1000) -> ImageTk.PhotoImage:
         """Convert a frame to a Tkinter-compatible image."""
-        aspect_ratio = frame.shape[1] / frame.shape[0]
-        display_height = int(display_width / aspect_ratio)
-        img_resized = cv2.resize(frame, (display_width, display_height))
-        img_rgb = cv2.cvtColor(img_resized, cv2.COLOR_BGR2RGB)
-        img_pil = Image.fromarray(img_rgb)
-        return ImageTk.PhotoImage(image=img_pil)
+        return ImageTk.PhotoImage(image=self.get_display_frame(frame, display_width))
 
     def toggle_pause(self):
         """Toggle video pause state."""
         self.is_paused = not self.is_paused
+        if not self.is_paused:
+            self.paused_frame = None
 
     def release(self):
         """Release the video capture."""